@@ -0,0 +1,244 @@
+"""HTTP/JSON API over the lost & found data, for desks that log reports in bulk.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+"""
+import csv
+import io
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+import core
+from core import campus, metrics
+from core.archive import search_archive
+from core.storage import CATEGORIES, ITEM_FIELDS, KINDS, STATUSES, TIMESTAMP_FORMAT, CursorError
+
+# API Configuration
+API_KEY = os.environ.get("LOST_FOUND_API_KEY", "")
+BATCH_SIZE = 5000
+EXPORT_CHUNK_ROWS = 500
+MAX_REPORTED_ERRORS = 20
+REQUIRED_FIELDS = ("name", "contact", "category", "description", "location")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    core.start_worker()
+    yield
+
+
+app = FastAPI(title="AWKUM Lost & Found API", lifespan=lifespan)
+
+
+if metrics.ENABLED:
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # Label by route template, not raw path, so ids don't create a series each
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.observe("http_request_seconds", time.perf_counter() - started, method=request.method, route=route)
+        metrics.increment("http_requests_total", method=request.method, route=route, status=response.status_code)
+        metrics.increment("http_request_bytes_total", int(request.headers.get("content-length") or 0), route=route)
+        return response
+
+
+def require_api_key(x_api_key=Header(default="")):
+    if API_KEY and x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Missing or invalid X-API-Key header")
+
+
+def require_desk_key(x_api_key=Header(default="")):
+    """Desk-only endpoints (status changes, exports of contact details) are refused outright without a key."""
+    if not API_KEY:
+        raise HTTPException(status_code=503, detail="Set LOST_FOUND_API_KEY to enable this endpoint")
+    require_api_key(x_api_key)
+
+
+def check_kind(kind):
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown report kind: {kind!r}")
+
+
+def clean_record(record):
+    """Validate one incoming report the way the Streamlit forms do; returns (record, error)."""
+    if not isinstance(record, dict):
+        return None, "expected an object"
+    cleaned = {field: str(record.get(field) or "").strip() for field in REQUIRED_FIELDS}
+    missing = [field for field in REQUIRED_FIELDS if not cleaned[field]]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    if cleaned["category"] not in CATEGORIES:
+        return None, f"unknown category {cleaned['category']!r}"
+    timestamp = str(record.get("timestamp") or "").strip()
+    if timestamp:
+        try:
+            datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            return None, f"timestamp must look like {datetime(2026, 1, 31, 14, 5).strftime(TIMESTAMP_FORMAT)}"
+        cleaned["timestamp"] = timestamp
+    return cleaned, None
+
+
+def parse_records(body, content_type):
+    """Rows of a CSV, NDJSON or JSON-array request body."""
+    text = body.decode("utf-8-sig")
+    if "csv" in content_type:
+        return list(csv.DictReader(io.StringIO(text)))
+    try:
+        if "ndjson" in content_type:
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        records = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of reports")
+    return records
+
+
+# Reports
+@app.post("/reports/{kind}", status_code=201, dependencies=[Depends(require_api_key)])
+async def create_report(kind, request: Request):
+    check_kind(kind)
+    try:
+        record = await request.json()
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    record, error = clean_record(record)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
+    items = await run_in_threadpool(core.get_data_layer().add_reports, kind, [record])
+    return items[0]
+
+
+@app.post("/reports/{kind}/batch", status_code=201, dependencies=[Depends(require_api_key)])
+async def import_reports(kind, request: Request):
+    """Bulk insert from CSV (text/csv), NDJSON (application/x-ndjson) or a JSON array.
+
+    Every row is validated before anything is written, so a bad spreadsheet imports nothing.
+    """
+    check_kind(kind)
+    records = parse_records(await request.body(), request.headers.get("content-type", ""))
+    cleaned, errors = [], []
+    for row, record in enumerate(records, start=1):
+        record, error = clean_record(record)
+        if error:
+            errors.append({"row": row, "error": error})
+        else:
+            cleaned.append(record)
+    if errors:
+        raise HTTPException(status_code=422, detail={
+            "invalid_rows": len(errors), "errors": errors[:MAX_REPORTED_ERRORS],
+        })
+
+    data = core.get_data_layer()
+    ids = []
+    for start in range(0, len(cleaned), BATCH_SIZE):
+        items = await run_in_threadpool(data.add_reports, kind, cleaned[start:start + BATCH_SIZE])
+        ids.extend(item["id"] for item in items)
+    return {"imported": len(ids), "ids": ids}
+
+
+@app.get("/reports/{kind}")
+def search_reports(kind, q="", mode="keyword", cursor=None, near=None, radius: int = campus.ADJACENT_METRES):
+    """`near` narrows to a campus zone, or to the places within `radius` metres of a building."""
+    check_kind(kind)
+    data = core.get_data_layer()
+    result = {}
+    if mode == "fuzzy" and q:
+        result["suggested"], q = data.correct(q)
+    semantic = mode == "semantic"
+    places = None
+    if near:
+        places = campus.places_near(near, radius)
+        if places is None:
+            raise HTTPException(status_code=422, detail=f"Unknown campus location {near!r}")
+    try:
+        if places is not None:
+            page, _ = data.facet_search(q, kind, {"place": places}, semantic, cursor or None)
+        else:
+            page = data.search_page(q, kind, semantic=semantic, cursor=cursor or None)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return dict(result, items=page.items, next_cursor=page.next_cursor)
+
+
+@app.get("/reports/{kind}/export", dependencies=[Depends(require_desk_key)])
+def export_reports(kind, format="csv"):
+    """Stream every report of a kind as CSV or NDJSON without loading the table into memory."""
+    check_kind(kind)
+    store = core.get_data_layer().store
+    if format == "ndjson":
+        lines = (json.dumps(item) + "\n" for item in store.iter_items(kind))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    if format != "csv":
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+    def csv_chunks():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=ITEM_FIELDS + ("status",), extrasaction="ignore")
+        writer.writeheader()
+        for n, item in enumerate(store.iter_items(kind), start=1):
+            writer.writerow(item)
+            if n % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(csv_chunks(), media_type="text/csv", headers={
+        "Content-Disposition": f'attachment; filename="{kind}_reports.csv"',
+    })
+
+
+@app.post("/reports/{kind}/{item_id}/status", dependencies=[Depends(require_desk_key)])
+async def update_status(kind, item_id: int, request: Request):
+    """Desk staff mark a report claimed or resolved: {"status": "claimed"}."""
+    check_kind(kind)
+    try:
+        body = await request.json()
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="Expected a JSON object")
+    status = body.get("status")
+    if status not in STATUSES:
+        raise HTTPException(status_code=422, detail=f"status must be one of {', '.join(STATUSES)}")
+    if not await run_in_threadpool(core.get_data_layer().update_status, kind, item_id, status):
+        raise HTTPException(status_code=404, detail=f"{kind.upper()}-{item_id} not found")
+    return {"kind": kind, "id": item_id, "status": status}
+
+
+@app.get("/archive")
+def search_archived(q, kind=None):
+    """Search resolved and stale reports moved out of the database (a scan of the archive files)."""
+    if kind:
+        check_kind(kind)
+    return {"items": search_archive(q, kind)}
+
+
+@app.get("/reports/{kind}/{item_id}")
+def get_report(kind, item_id: int):
+    check_kind(kind)
+    store = core.get_data_layer().store
+    item = store.get_item(kind, item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"{kind.upper()}-{item_id} not found")
+    item["matches"] = [
+        {"id": match["id"], "category": match["category"], "score": round(score, 3)}
+        for match, score in store.top_matches(kind, item_id)
+    ]
+    return item
+
+
+# Monitoring
+@app.get("/metrics", response_class=PlainTextResponse)
+def export_metrics():
+    """Prometheus text format; empty unless the API runs with LOST_FOUND_METRICS=1."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
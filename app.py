@@ -1,8 +1,13 @@
 import streamlit as st
-from groq import Groq
-import json
 import os
-from datetime import datetime
+import time
+from datetime import timedelta
+import core
+from core import campus, chat_context, metrics, search, stats
+from core.archive import search_archive, semester
+from core.facets import TOP_LOCATIONS
+from core.images import ImageError
+from core.storage import CATEGORIES
 
 # Page config
 st.set_page_config(
@@ -12,6 +17,22 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Per-rerun timing, and a profile of each rerun when LOST_FOUND_PROFILE is set
+rerun_started = time.perf_counter()
+profiler = metrics.start_profile()
+
+def finish_rerun():
+    """Record this rerun's time and stop its profiler; returns the saved profile, if any."""
+    page = st.session_state.get("current_page", "Home")
+    metrics.observe("app_rerun_seconds", time.perf_counter() - rerun_started, page=page)
+    metrics.maybe_write_file()
+    return metrics.finish_profile(profiler, name=page.lower().replace(" ", "_"))
+
+def rerun():
+    # st.rerun() ends the script at once, so the profiler must be stopped first or it stays enabled
+    finish_rerun()
+    st.rerun()
+
 # Backend Configuration - Secure API Key Loading
 GROQ_API_KEY = None
 
@@ -25,11 +46,14 @@ except:
 if not GROQ_API_KEY:
     GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
 
-# Initialize Groq client
+# Optional override, e.g. scripts/fake_groq_server.py for offline testing
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "")
+
+# Initialize Groq client (once per process)
 client = None
 if GROQ_API_KEY and GROQ_API_KEY != "YOUR_GROQ_API_KEY_HERE":
     try:
-        client = Groq(api_key=GROQ_API_KEY)
+        client = core.get_chat_client(GROQ_API_KEY, GROQ_BASE_URL)
     except Exception as e:
         st.sidebar.warning(f"⚠️ AI initialization failed")
         client = None
@@ -37,315 +61,156 @@ else:
     st.sidebar.info("ℹ️ AI chat disabled: Configure GROQ_API_KEY to enable")
 
 # Custom CSS
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Crimson+Text:wght@400;600;700&display=swap');
-    
-    * {
-        font-family: 'Crimson Text', 'Times New Roman', serif !important;
-    }
-    
-    [data-testid="collapsedControl"] {
-        display: none;
-    }
-    
-    .main {
-        background-color: #f8f9fa;
-        padding: 0 !important;
-    }
-    
-    .block-container {
-        padding-top: 1rem !important;
-        max-width: 1400px !important;
-    }
-    
-    .awkum-header {
-        background: linear-gradient(135deg, #800000, #a00000);
-        padding: 2rem 3rem;
-        text-align: center;
-        color: white !important;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        margin: -1rem -1rem 0 -1rem;
-    }
-    
-    .awkum-header h1 {
-        color: white !important;
-        font-size: 2.8rem;
-        margin: 0;
-        font-weight: 700;
-        letter-spacing: 1px;
-    }
-    
-    .awkum-header p {
-        color: #FFC72C !important;
-        font-size: 1.3rem;
-        margin: 0.5rem 0 0 0;
-        font-weight: 600;
-    }
-    
-    .content-wrapper {
-        background: white;
-        padding: 2.5rem;
-        border-radius: 12px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-        margin-bottom: 2rem;
-    }
-    
-    .section-title {
-        color: #800000;
-        font-size: 2rem;
-        font-weight: 700;
-        margin-bottom: 1.5rem;
-        padding-bottom: 0.8rem;
-        border-bottom: 3px solid #FFC72C;
-    }
-    
-    .stButton>button {
-        background: linear-gradient(135deg, #800000, #a00000) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 8px !important;
-        padding: 0.7rem 2.5rem !important;
-        font-weight: 600 !important;
-        font-size: 1.05rem !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 6px rgba(128,0,0,0.3) !important;
-    }
-    
-    .stButton>button:hover {
-        background: linear-gradient(135deg, #a00000, #c00000) !important;
-        transform: translateY(-2px) !important;
-        box-shadow: 0 6px 12px rgba(128,0,0,0.4) !important;
-    }
-    
-    .stTextInput>div>div>input,
-    .stTextArea>div>div>textarea,
-    .stSelectbox>div>div>select {
-        border: 2px solid #e0e0e0 !important;
-        border-radius: 8px !important;
-        padding: 0.6rem !important;
-        font-size: 1rem !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .stTextInput>div>div>input:focus,
-    .stTextArea>div>div>textarea:focus {
-        border-color: #800000 !important;
-        box-shadow: 0 0 0 3px rgba(128,0,0,0.1) !important;
-    }
-    
-    .info-card {
-        background: linear-gradient(135deg, #f8f9fa, #ffffff);
-        padding: 2rem;
-        border-radius: 12px;
-        border-left: 5px solid #17a2b8;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-    }
-    
-    .success-card {
-        background: linear-gradient(135deg, #f8f9fa, #ffffff);
-        padding: 2rem;
-        border-radius: 12px;
-        border-left: 5px solid #28a745;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-    }
-    
-    .result-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #800000;
-        margin: 1rem 0;
-        box-shadow: 0 3px 10px rgba(0,0,0,0.1);
-        transition: all 0.3s ease;
-    }
-    
-    .result-card:hover {
-        transform: translateX(5px);
-        box-shadow: 0 5px 15px rgba(128,0,0,0.2);
-    }
-    
-    .stat-card {
-        background: linear-gradient(135deg, #800000, #a00000);
-        color: white;
-        padding: 2.5rem;
-        border-radius: 15px;
-        text-align: center;
-        box-shadow: 0 6px 15px rgba(128,0,0,0.3);
-        transition: all 0.3s ease;
-    }
-    
-    .stat-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 25px rgba(128,0,0,0.4);
-    }
-    
-    .stat-number {
-        font-size: 3.5rem;
-        font-weight: bold;
-        color: #FFC72C;
-        margin: 1rem 0;
-    }
-    
-    .stat-label {
-        font-size: 1.2rem;
-        color: white;
-        font-weight: 600;
-    }
-    
-    .chat-container {
-        background: white;
-        border: 2px solid #FFC72C;
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin-top: 2rem;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-        max-height: 500px;
-        overflow-y: auto;
-    }
-    
-    .chat-message {
-        padding: 1rem;
-        border-radius: 12px;
-        margin: 0.5rem 0;
-        animation: fadeIn 0.3s ease;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .user-message {
-        background: linear-gradient(135deg, #800000, #a00000);
-        color: white;
-        margin-left: 15%;
-    }
-    
-    .assistant-message {
-        background: #f8f9fa;
-        color: #333;
-        border: 2px solid #e0e0e0;
-        margin-right: 15%;
-    }
-    
-    .footer {
-        text-align: center;
-        padding: 2rem;
-        color: #666;
-        background: white;
-        border-top: 3px solid #FFC72C;
-        margin-top: 3rem;
-    }
-    
-    @media (max-width: 768px) {
-        .stat-number {
-            font-size: 2.5rem;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def load_css(path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+st.markdown(f"<style>\n{load_css()}\n</style>", unsafe_allow_html=True)
+
+# Database (shared by every session in this process)
+data = core.get_data_layer()
+data.refresh()
+store = data.store
+core.start_worker()
 
 # Session State
-if 'lost_items_db' not in st.session_state:
-    st.session_state.lost_items_db = []
-if 'found_items_db' not in st.session_state:
-    st.session_state.found_items_db = []
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'chat_context' not in st.session_state:
+    st.session_state.chat_context = chat_context.new_state()
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Home"
+if 'my_lost_reports' not in st.session_state:
+    st.session_state.my_lost_reports = []
 
 # Database Functions
-def save_data():
-    data = {
-        'lost': st.session_state.lost_items_db,
-        'found': st.session_state.found_items_db
-    }
-    try:
-        with open('lost_found_data.json', 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        pass
+def claim_code_note(item):
+    return (f"Your claim code is **{item['claim_code']}**. Keep it: it is shown only this once, "
+            "and you need it to mark the report claimed or resolved.")
 
-def load_data():
-    try:
-        with open('lost_found_data.json', 'r') as f:
-            data = json.load(f)
-            st.session_state.lost_items_db = data.get('lost', [])
-            st.session_state.found_items_db = data.get('found', [])
-    except:
-        pass
-
-def report_lost(name, contact, category, description, location):
-    item = {
-        "id": len(st.session_state.lost_items_db) + 1,
-        "name": name,
-        "contact": contact,
-        "category": category,
-        "description": description,
-        "location": location,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    st.session_state.lost_items_db.append(item)
-    save_data()
-    return f"✅ Report LOST-{item['id']} saved successfully!"
-
-def report_found(name, contact, category, description, location):
-    item = {
-        "id": len(st.session_state.found_items_db) + 1,
-        "name": name,
-        "contact": contact,
-        "category": category,
-        "description": description,
-        "location": location,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    st.session_state.found_items_db.append(item)
-    save_data()
-    return f"✅ Report FOUND-{item['id']} saved successfully!"
+def report_lost(name, contact, category, description, location, photo=None):
+    item = data.add_report("lost", name, contact, category, description, location, photo)
+    st.session_state.my_lost_reports.append(item["id"])
+    return f"✅ Report LOST-{item['id']} saved successfully! {claim_code_note(item)}", item
+
+def report_found(name, contact, category, description, location, photo=None):
+    item = data.add_report("found", name, contact, category, description, location, photo)
+    return f"✅ Report FOUND-{item['id']} saved successfully! {claim_code_note(item)}", item
+
+def show_similar_photos(item):
+    similar = data.similar_by_photo(item["kind"], item["id"])
+    if not similar:
+        return
+    other = "found" if item["kind"] == "lost" else "lost"
+    photos = data.store.first_images(other, [match["id"] for match, _ in similar])
+    st.markdown(f"**📷 {other.title()} items with similar photos:**")
+    for col, (match, distance) in zip(st.columns(len(similar)), similar):
+        with col:
+            st.image(data.images.path(photos[match["id"]], thumbnail=True), caption=f"{other.upper()}-{match['id']} {match['category']}")
+
+def format_matches(kind, item_id):
+    other = "FOUND" if kind == "lost" else "LOST"
+    return ", ".join(
+        f"{other}-{match['id']} {match['category']} ({score:.0%})"
+        for match, score in store.top_matches(kind, item_id)
+    )
 
-def search_items(query, search_type):
-    db = st.session_state.lost_items_db if search_type == "Lost Items" else st.session_state.found_items_db
-    if not db:
+def search_items(query, search_type, mode="Keyword", filters=None, cursor=None):
+    """(page, facet counts) for the Search page."""
+    kind = "lost" if search_type == "Lost Items" else "found"
+    return data.facet_search(query, kind, filters or {}, semantic=(mode == "Semantic"), cursor=cursor)
+
+def days_between(dates):
+    if len(dates) != 2:
         return []
-    results = []
-    q = query.lower() if query else ""
-    for item in db:
-        if not q or q in item['description'].lower() or q in item['category'].lower() or q in item['location'].lower():
-            results.append(item)
-    return results
-
-def ai_chat(message):
+    start, end = dates
+    return [(start + timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+
+def place_label(key, counts):
+    return f"{campus.PLACES_BY_KEY[key].name} ({counts['place'].get(key, 0)})"
+
+def place_suffix(item):
+    """The canonical building after a free-text location, when it reads differently."""
+    place = campus.PLACES_BY_KEY.get(item.get("place"))
+    if place is None or place.name.lower() == item["location"].strip().lower():
+        return ""
+    return f" ({place.name})"
+
+STATUS_BADGES = {"open": "", "claimed": "· ✋ Claimed", "resolved": "· ✅ Resolved"}
+
+def status_controls(item):
+    """Let the person who filed a report mark it claimed or resolved, confirmed by the claim code issued with it."""
+    with st.expander("Update status"):
+        key = f"{item['kind']}_{item['id']}"
+        code = st.text_input("Claim code for this report", key=f"status_code_{key}", type="password")
+        col1, col2 = st.columns(2)
+        for col, status, label in ((col1, "claimed", "✋ Mark Claimed"), (col2, "resolved", "✅ Mark Resolved")):
+            with col:
+                if st.button(label, key=f"status_{status}_{key}", use_container_width=True, disabled=item["status"] == status):
+                    if data.update_status(item["kind"], item["id"], status, code):
+                        rerun()
+                    else:
+                        st.error("❌ That claim code does not match this report. Reports filed without one can be updated at the Lost & Found desk.")
+
+# Pagination
+def current_page(name, signature, fetch):
+    """Fetch the current page of a cursor-paged list; paging restarts when `signature` changes."""
+    pager = st.session_state.get(name)
+    if pager is None or pager["signature"] != signature:
+        pager = st.session_state[name] = {"signature": signature, "cursors": [None]}
+    return fetch(pager["cursors"][-1])
+
+def page_controls(name, page):
+    cursors = st.session_state[name]["cursors"]
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("⬅️ Previous", key=f"{name}_prev", use_container_width=True):
+            cursors.pop()
+            rerun()
+    with col2:
+        st.markdown(f'<p style="text-align: center; color: #666;">Page {len(cursors)}</p>', unsafe_allow_html=True)
+    with col3:
+        if page.next_cursor and st.button("Next ➡️", key=f"{name}_next", use_container_width=True):
+            cursors.append(page.next_cursor)
+            rerun()
+
+def chat_message_html(role, content, tokens=None):
+    css_class = "user-message" if role == "user" else "assistant-message"
+    label = "You" if role == "user" else "🤖 Assistant"
+    usage = ""
+    if tokens and tokens.get("cached"):
+        usage = '<div style="color: #888; font-size: 0.8rem; text-align: right;">⚡ Answered from cache</div>'
+    elif tokens and tokens.get("local"):
+        usage = '<div style="color: #888; font-size: 0.8rem; text-align: right;">📋 Answered from the report database</div>'
+    elif tokens and tokens.get("shared"):
+        usage = '<div style="color: #888; font-size: 0.8rem; text-align: right;">⚡ Shared with an identical question</div>'
+    elif tokens:
+        usage = f'<div style="color: #888; font-size: 0.8rem; text-align: right;">↑ {tokens["sent"]} tokens sent · ↓ {tokens["received"]} received</div>'
+    return f"""
+        <div class="chat-message {css_class}">
+            <strong>{label}:</strong> {content}
+            {usage}
+        </div>
+        """
+
+def ai_chat(message, placeholder=None):
     if not message:
         return
     
     st.session_state.chat_history.append({"role": "user", "content": message})
     
-    if client is None:
-        bot_response = "⚠️ AI service is currently unavailable. Please configure your Groq API key."
-    else:
-        try:
-            api_messages = [
-                {"role": "system", "content": "You are the AWKUM Lost & Found AI Assistant. Be helpful, friendly, and concise. Location: Abdul Wali Khan University Mardan, Pakistan. Help users with lost and found queries, guide them on using the system, and provide relevant information."},
-            ] + st.session_state.chat_history
-            
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=api_messages,
-                max_tokens=300,
-                temperature=0.7
+    def show_partial(reply):
+        if placeholder is not None:
+            placeholder.markdown(
+                chat_message_html("user", message) + chat_message_html("assistant", reply + " ▌"),
+                unsafe_allow_html=True,
             )
-            bot_response = response.choices[0].message.content
-        except Exception as e:
-            bot_response = f"❌ I encountered an error. Please check your API key and try again."
     
-    st.session_state.chat_history.append({"role": "assistant", "content": bot_response})
-
-# Load data
-load_data()
+    bot_response, tokens = core.get_chat_service(client).reply(
+        st.session_state.chat_history, st.session_state.chat_context, on_text=show_partial,
+    )
+    st.session_state.chat_history.append({"role": "assistant", "content": bot_response, "tokens": tokens})
 
 # Header
 st.markdown("""
@@ -364,7 +229,11 @@ for idx, page in enumerate(pages):
     with cols[idx]:
         if st.button(page, key=f"nav_{page}", use_container_width=True):
             st.session_state.current_page = page
-            st.rerun()
+            rerun()
+
+# Matches found by the background worker for lost items reported in this session
+for notification in store.notifications_for("lost", st.session_state.my_lost_reports)[:3]:
+    st.info(f"🔔 {notification['message']}")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -401,7 +270,7 @@ if st.session_state.current_page == "Home":
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Lost Items Reported</div>
-            <div class="stat-number">{len(st.session_state.lost_items_db)}</div>
+            <div class="stat-number">{data.count('lost')}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -409,7 +278,7 @@ if st.session_state.current_page == "Home":
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Found Items Reported</div>
-            <div class="stat-number">{len(st.session_state.found_items_db)}</div>
+            <div class="stat-number">{data.count('found')}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -428,11 +297,12 @@ elif st.session_state.current_page == "Report Lost":
         
         col1, col2 = st.columns(2)
         with col1:
-            l_category = st.selectbox("Item Category *", ["Mobile", "Wallet", "Keys", "Laptop", "Bag", "ID Card", "Books", "Charger", "Headphones", "Other"])
+            l_category = st.selectbox("Item Category *", CATEGORIES)
         with col2:
             l_location = st.text_input("Location Lost *", placeholder="e.g., Main Library, CS Department")
         
         l_description = st.text_area("Detailed Description *", placeholder="Provide detailed description (color, brand, model, distinctive features, etc.)", height=120)
+        l_photo = st.file_uploader("Photo (optional)", type=["jpg", "jpeg", "png", "webp"])
         
         submitted = st.form_submit_button("📝 Submit Lost Report", use_container_width=True)
         
@@ -440,9 +310,14 @@ elif st.session_state.current_page == "Report Lost":
             if not l_name or not l_contact or not l_description or not l_location:
                 st.error("❌ Please fill all required fields!")
             else:
-                result = report_lost(l_name, l_contact, l_category, l_description, l_location)
-                st.success(result)
-                st.balloons()
+                try:
+                    result, item = report_lost(l_name, l_contact, l_category, l_description, l_location, l_photo.getvalue() if l_photo else None)
+                except ImageError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success(result)
+                    show_similar_photos(item)
+                    st.balloons()
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -459,11 +334,12 @@ elif st.session_state.current_page == "Report Found":
         
         col1, col2 = st.columns(2)
         with col1:
-            f_category = st.selectbox("Item Category *", ["Mobile", "Wallet", "Keys", "Laptop", "Bag", "ID Card", "Books", "Charger", "Headphones", "Other"])
+            f_category = st.selectbox("Item Category *", CATEGORIES)
         with col2:
             f_location = st.text_input("Location Found *", placeholder="e.g., Main Library, CS Department")
         
         f_description = st.text_area("Detailed Description *", placeholder="Provide detailed description (color, brand, model, distinctive features, etc.)", height=120)
+        f_photo = st.file_uploader("Photo (optional)", type=["jpg", "jpeg", "png", "webp"])
         
         submitted = st.form_submit_button("📝 Submit Found Report", use_container_width=True)
         
@@ -471,9 +347,14 @@ elif st.session_state.current_page == "Report Found":
             if not f_name or not f_contact or not f_description or not f_location:
                 st.error("❌ Please fill all required fields!")
             else:
-                result = report_found(f_name, f_contact, f_category, f_description, f_location)
-                st.success(result)
-                st.balloons()
+                try:
+                    result, item = report_found(f_name, f_contact, f_category, f_description, f_location, f_photo.getvalue() if f_photo else None)
+                except ImageError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success(result)
+                    show_similar_photos(item)
+                    st.balloons()
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -481,40 +362,112 @@ elif st.session_state.current_page == "Search":
     st.markdown('<div class="content-wrapper">', unsafe_allow_html=True)
     st.markdown('<h2 class="section-title">🔎 Search Database</h2>', unsafe_allow_html=True)
     
-    search_type = st.radio("Search In:", ["Found Items", "Lost Items"], horizontal=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        search_type = st.radio("Search In:", ["Found Items", "Lost Items"], horizontal=True)
+    with col2:
+        search_mode = st.radio("Search Mode:", ["Keyword", "Fuzzy", "Semantic"], horizontal=True, help="Fuzzy mode forgives typos, e.g. 'walet'. Semantic mode also finds related words, e.g. 'purse' for Wallet")
     search_query = st.text_input("🔍 Enter keywords to search", placeholder="e.g., Wallet, iPhone, Keys, Blue Bag...")
     
+    # Facet filters; their counts come from the same lookup as the results, so it runs first
+    near = st.session_state.get("filter_near")
+    filters = {
+        "category": st.session_state.get("filter_category", []),
+        "location": st.session_state.get("filter_location", []),
+        "day": days_between(st.session_state.get("filter_dates", ())),
+        "place": list(campus.nearby_keys(near, st.session_state.get("filter_radius", campus.ADJACENT_METRES))) if near else [],
+    }
+    # Fuzzy mode searches the corrected spelling; the other modes only suggest it
+    suggested, expanded = data.correct(search_query) if search_query else ("", "")
+    misspelled = suggested != " ".join(search.tokenize(search_query))
+    effective_query = expanded if search_mode == "Fuzzy" else search_query
+    page, counts = current_page(
+        "search_pager",
+        (search_query, search_type, search_mode, filters),
+        lambda cursor: search_items(effective_query, search_type, search_mode, filters, cursor),
+    )
+    
+    with st.expander("🎛️ Filters", expanded=any(filters.values())):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.multiselect("Category", CATEGORIES, key="filter_category",
+                           format_func=lambda c: f"{c} ({counts['category'].get(c, 0)})")
+        with col2:
+            top_locations = sorted(counts["location"], key=lambda l: (-counts["location"][l], l))[:TOP_LOCATIONS]
+            st.multiselect("Location", top_locations + [l for l in filters["location"] if l not in top_locations],
+                           key="filter_location", format_func=lambda l: f"{l.title()} ({counts['location'].get(l, 0)})")
+        with col3:
+            st.date_input("Reported Between", value=(), key="filter_dates")
+            if filters["day"]:
+                st.caption(f"{sum(counts['day'].get(day, 0) for day in filters['day'])} reports in these dates")
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.selectbox("Near", [""] + [place.key for place in campus.PLACES], key="filter_near",
+                         format_func=lambda key: place_label(key, counts) if key else "Anywhere on campus")
+        with col2:
+            st.slider("Within (metres)", 0, 500, campus.ADJACENT_METRES, step=50, key="filter_radius",
+                      help="0 keeps to the building itself; larger distances take in neighbouring buildings")
+        if filters["place"]:
+            st.caption("Including " + ", ".join(campus.PLACES_BY_KEY[key].name for key in filters["place"]))
+    
     col1, col2 = st.columns([3, 1])
     with col1:
-        search_btn = st.button("🔍 Search Now", use_container_width=True)
+        if st.button("🔍 Search Now", use_container_width=True):
+            st.session_state.search_active = True
     with col2:
         if st.button("🔄 Clear", use_container_width=True):
-            st.rerun()
+            st.session_state.search_active = False
+            for key in ("search_pager", "filter_category", "filter_location", "filter_dates", "filter_near", "filter_radius"):
+                st.session_state.pop(key, None)
+            rerun()
     
-    if search_btn or search_query:
-        results = search_items(search_query, search_type)
+    if st.session_state.get("search_active") or search_query or any(filters.values()):
+        results = page.items
+        
+        if misspelled and search_mode == "Fuzzy":
+            st.info(f"🔤 Showing results for **{suggested}**")
+        elif misspelled and not results:
+            st.info(f"🔤 Did you mean **{suggested}**? Switch to Fuzzy mode to search for it.")
         
         if not results:
             st.warning("📭 No matching items found. Try different keywords or check other category.")
         else:
-            st.success(f"✅ Found {len(results)} matching item(s)")
+            st.success(f"✅ Showing {len(results)} matching item(s){', best matches first' if search_query else ', newest first'}")
             st.markdown("<br>", unsafe_allow_html=True)
             
+            photos = data.store.first_images(results[0]["kind"], [item["id"] for item in results])
             for item in results:
                 contact_label = "Finder Contact" if search_type == "Found Items" else "Owner Contact"
+                likely = format_matches(item["kind"], item["id"])
+                likely_html = f'<p style="margin: 0.3rem 0;"><strong>🔗 Likely Matches:</strong> {likely}</p>' if likely else ""
                 st.markdown(f"""
                 <div class="result-card">
                     <div style="display: flex; justify-content: space-between; align-items: start;">
                         <div style="flex: 1;">
-                            <h3 style="color: #800000; margin: 0 0 0.5rem 0;">🆔 ID: {item["id"]} - {item["category"]}</h3>
+                            <h3 style="color: #800000; margin: 0 0 0.5rem 0;">🆔 ID: {item["id"]} - {item["category"]} {STATUS_BADGES[item["status"]]}</h3>
                             <p style="margin: 0.3rem 0;"><strong>📝 Description:</strong> {item["description"]}</p>
-                            <p style="margin: 0.3rem 0;"><strong>📍 Location:</strong> {item["location"]}</p>
+                            <p style="margin: 0.3rem 0;"><strong>📍 Location:</strong> {item["location"]}{place_suffix(item)}</p>
                             <p style="margin: 0.3rem 0;"><strong>📞 {contact_label}:</strong> {item["contact"]}</p>
+                            {likely_html}
                             <p style="margin: 0.3rem 0; color: #666; font-size: 0.9rem;"><strong>🕐 Reported:</strong> {item.get("timestamp", "N/A")}</p>
                         </div>
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
+                if item["id"] in photos:
+                    st.image(data.images.path(photos[item["id"]], thumbnail=True), width=160)
+                if item["status"] != "resolved":
+                    status_controls(item)
+            
+            page_controls("search_pager", page)
+    
+    if search_query and st.checkbox("🗄️ Also search archived reports", help="Resolved and older reports from past semesters"):
+        kind = "lost" if search_type == "Lost Items" else "found"
+        archived = search_archive(search_query, kind)
+        st.caption(f"{len(archived)} archived report(s)")
+        for item in archived:
+            st.markdown(f"**{item['kind'].upper()}-{item['id']} {item['category']}** ({semester(item['timestamp'])}, {item['status']}): "
+                        f"{item['description']} at {item['location']}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -528,7 +481,7 @@ elif st.session_state.current_page == "Statistics":
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Lost Items</div>
-            <div class="stat-number">{len(st.session_state.lost_items_db)}</div>
+            <div class="stat-number">{data.count('lost')}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -536,12 +489,12 @@ elif st.session_state.current_page == "Statistics":
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Found Items</div>
-            <div class="stat-number">{len(st.session_state.found_items_db)}</div>
+            <div class="stat-number">{data.count('found')}</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        total = len(st.session_state.lost_items_db) + len(st.session_state.found_items_db)
+        total = data.count('lost') + data.count('found')
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">Total Reports</div>
@@ -549,33 +502,78 @@ elif st.session_state.current_page == "Statistics":
         </div>
         """, unsafe_allow_html=True)
     
-    st.markdown("<br><br>", unsafe_allow_html=True)
-    st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">📝 Recent Activity</h3>', unsafe_allow_html=True)
+    snapshot = data.stats()
     
-    all_items = []
-    for item in st.session_state.lost_items_db:
-        item_copy = item.copy()
-        item_copy['type'] = 'Lost'
-        all_items.append(item_copy)
+    if snapshot["categories"]:
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">📂 By Category</h3>', unsafe_allow_html=True)
+            st.bar_chart(
+                {
+                    "Category": [key for key, _, _ in snapshot["categories"]],
+                    "Lost": [lost for _, lost, _ in snapshot["categories"]],
+                    "Found": [found for _, _, found in snapshot["categories"]],
+                },
+                x="Category", y=["Lost", "Found"],
+            )
+        with col2:
+            st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">📅 Reports Per Day</h3>', unsafe_allow_html=True)
+            st.bar_chart(
+                {
+                    "Day": [key for key, _, _ in snapshot["days"]],
+                    "Lost": [lost for _, lost, _ in snapshot["days"]],
+                    "Found": [found for _, _, found in snapshot["days"]],
+                },
+                x="Day", y=["Lost", "Found"],
+            )
+        
+        st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">📍 Top Locations</h3>', unsafe_allow_html=True)
+        for location, lost, found in snapshot["locations"]:
+            st.markdown(f"""
+            <div class="result-card">
+                📍 <strong>{location.title()}</strong>
+                <span style="color: #666; font-size: 0.9rem; float: right;">📢 {lost} lost · 🎉 {found} found</span>
+            </div>
+            """, unsafe_allow_html=True)
     
-    for item in st.session_state.found_items_db:
-        item_copy = item.copy()
-        item_copy['type'] = 'Found'
-        all_items.append(item_copy)
+    st.markdown("<br><br>", unsafe_allow_html=True)
+    st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">📝 Recent Activity</h3>', unsafe_allow_html=True)
     
-    all_items.sort(key=lambda x: x.get('id', 0), reverse=True)
+    page = current_page(
+        "recent_pager", None,
+        lambda cursor: search.Page(*store.recent_page(cursor, stats.RECENT_ACTIVITY_SIZE)),
+    )
     
-    if not all_items:
+    if not page.items:
         st.info("📭 No activity yet. Be the first to report an item!")
     else:
-        for item in all_items[:10]:
-            icon = "📢" if item['type'] == 'Lost' else "🎉"
+        for item in page.items:
+            icon = "📢" if item['kind'] == 'lost' else "🎉"
             st.markdown(f"""
             <div class="result-card">
-                {icon} <strong>{item['type']}:</strong> {item['category']} - {item['description'][:80]}{'...' if len(item['description']) > 80 else ''}
+                {icon} <strong>{item['kind'].title()}:</strong> {item['category']} - {item['description'][:80]}{'...' if len(item['description']) > 80 else ''}
                 <span style="color: #666; font-size: 0.9rem; float: right;">🕐 {item.get('timestamp', 'N/A')}</span>
             </div>
             """, unsafe_allow_html=True)
+        
+        page_controls("recent_pager", page)
+    
+    st.markdown("<br><br>", unsafe_allow_html=True)
+    st.markdown('<h3 style="color: #800000; border-bottom: 2px solid #FFC72C; padding-bottom: 0.5rem;">🔗 Likely Matches</h3>', unsafe_allow_html=True)
+    
+    best_matches = data.best_matches(10)
+    
+    if not best_matches:
+        st.info("📭 No likely lost ↔ found matches yet.")
+    else:
+        for lost, found, score in best_matches:
+            st.markdown(f"""
+            <div class="result-card">
+                📢 <strong>LOST-{lost['id']}:</strong> {lost['description'][:60]} ↔ 🎉 <strong>FOUND-{found['id']}:</strong> {found['description'][:60]}
+                <span style="color: #666; font-size: 0.9rem; float: right;">{score:.0%} match</span>
+            </div>
+            """, unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -584,7 +582,7 @@ elif st.session_state.current_page == "AI Chat":
     st.markdown('<h2 class="section-title">🤖 AI Assistant</h2>', unsafe_allow_html=True)
     
     if client is None:
-        st.warning("⚠️ AI chat requires a valid Groq API key. Add GROQ_API_KEY to your environment or Streamlit secrets.")
+        st.warning("⚠️ No Groq API key is configured, so answers come from the report database. Add GROQ_API_KEY to your environment or Streamlit secrets for the AI assistant.")
     
     st.markdown('<div class="chat-container">', unsafe_allow_html=True)
     
@@ -596,13 +594,10 @@ elif st.session_state.current_page == "AI Chat":
         """, unsafe_allow_html=True)
     
     for msg in st.session_state.chat_history:
-        css_class = "user-message" if msg["role"] == "user" else "assistant-message"
-        label = "You" if msg["role"] == "user" else "🤖 Assistant"
-        st.markdown(f"""
-        <div class="chat-message {css_class}">
-            <strong>{label}:</strong> {msg["content"]}
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(chat_message_html(msg["role"], msg["content"], msg.get("tokens")), unsafe_allow_html=True)
+    
+    # The next reply streams in here, token by token
+    reply_slot = st.empty()
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -613,12 +608,19 @@ elif st.session_state.current_page == "AI Chat":
         send_btn = st.button("Send", use_container_width=True)
     
     if send_btn and user_input:
-        ai_chat(user_input)
-        st.rerun()
+        ai_chat(user_input, reply_slot)
+        rerun()
     
     if st.button("🗑️ Clear Chat History", use_container_width=True):
         st.session_state.chat_history = []
-        st.rerun()
+        st.session_state.chat_context = chat_context.new_state()
+        rerun()
+    
+    cache_stats = core.get_response_cache().stats()
+    st.caption(
+        f"⚡ Response cache: {cache_stats['hits'] + cache_stats['near_hits']} hits · "
+        f"{cache_stats['misses']} misses · {cache_stats['hit_rate']:.0%} hit rate · {cache_stats['entries']} entries"
+    )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -630,3 +632,10 @@ st.markdown("""
     <p style="font-size: 0.95rem; color: #888;">Powered by AI | Built with ❤️ for AWKUM Community</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Observability
+profile = finish_rerun()
+if profile:
+    with st.sidebar.expander("⏱️ Rerun profile"):
+        st.caption(profile[0])
+        st.code(profile[1])
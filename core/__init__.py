@@ -0,0 +1,60 @@
+"""Lost & Found domain logic, usable without Streamlit.
+
+Heavy services are created on first use and shared by every session in the process.
+"""
+import threading
+
+_lock = threading.RLock()  # factories may themselves call other getters
+_instances = {}
+
+
+def _shared(key, factory):
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = _instances[key] = factory()
+    return instance
+
+
+def get_data_layer():
+    from .data_layer import DataLayer
+
+    return _shared("data_layer", DataLayer)
+
+
+def get_response_cache():
+    from .chat_cache import ResponseCache
+
+    return _shared("response_cache", ResponseCache)
+
+
+def get_chat_client(api_key, base_url=None):
+    from .chat import create_client
+
+    return _shared(("chat_client", api_key, base_url), lambda: create_client(api_key, base_url))
+
+
+def get_chat_limiter():
+    from .throttle import ChatLimiter
+
+    return _shared("chat_limiter", ChatLimiter)
+
+
+def get_chat_service(client=None):
+    from .chat import ChatService
+
+    return _shared(
+        ("chat_service", id(client)),
+        lambda: ChatService(get_data_layer(), client, get_response_cache(), get_chat_limiter()),
+    )
+
+
+def start_worker():
+    """Run a background job worker thread in this process, unless workers run separately (worker.py)."""
+    from .jobs import WORKER_MODE, start_thread
+
+    if WORKER_MODE != "thread":
+        return None
+    return _shared("worker", lambda: start_thread(get_data_layer()))
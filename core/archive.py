@@ -0,0 +1,93 @@
+import glob
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from .search import keywords, tokenize
+from .storage import TIMESTAMP_FORMAT
+
+# Archive Configuration
+ARCHIVE_DIR = os.environ.get("LOST_FOUND_ARCHIVE_DIR", "archive")
+RESOLVED_RETENTION_DAYS = 30
+STALE_AFTER_DAYS = 180
+ARCHIVE_BATCH = 5000
+ARCHIVE_INTERVAL_SECONDS = 24 * 60 * 60
+ARCHIVE_SEARCH_LIMIT = 20
+
+
+def semester(timestamp):
+    """AWKUM semester a report falls in: spring is February to July, fall is August to January."""
+    year, month = int(timestamp[:4]), int(timestamp[5:7])
+    if month == 1:
+        return f"{year - 1}-fall"
+    return f"{year}-spring" if month < 8 else f"{year}-fall"
+
+
+def semester_order(path):
+    year, term = os.path.basename(path).split(".")[0].split("-")
+    return int(year), term == "fall"
+
+
+def append_archive(path, items):
+    # Each call appends a new gzip member; gzip readers see the members as one stream
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            for item in items:
+                # Unescaped, so search_archive's raw-line prefilter also sees non-ASCII words
+                f.write((json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_reports(store, now=None, directory=ARCHIVE_DIR):
+    """Move resolved and stale reports into per-semester gzip JSONL files; returns their (kind, id) keys.
+
+    Rows are deleted only after their archive file is fsynced. A crash in between leaves
+    a duplicate in the archive, which search_archive skips, rather than losing a report.
+    """
+    now = now or datetime.now()
+    resolved_before = (now - timedelta(days=RESOLVED_RETENTION_DAYS)).strftime(TIMESTAMP_FORMAT)
+    stale_before = (now - timedelta(days=STALE_AFTER_DAYS)).strftime(TIMESTAMP_FORMAT)
+    archived = []
+    while True:
+        items = store.archive_candidates(resolved_before, stale_before, ARCHIVE_BATCH)
+        if not items:
+            return archived
+        by_semester = {}
+        for item in items:
+            item["archived"] = now.strftime(TIMESTAMP_FORMAT)
+            by_semester.setdefault(semester(item["timestamp"]), []).append(item)
+        for name, group in by_semester.items():
+            append_archive(os.path.join(directory, f"{name}.jsonl.gz"), group)
+        keys = [(item["kind"], item["id"]) for item in items]
+        store.delete_items(keys)
+        archived += keys
+
+
+def search_archive(query, kind=None, directory=ARCHIVE_DIR, limit=ARCHIVE_SEARCH_LIMIT):
+    """Scan the archive on demand, newest semester first; reports matching more query terms rank higher."""
+    terms = keywords(query)
+    if not terms:
+        return []
+    hits = []
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl.gz")), key=semester_order, reverse=True):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                lowered = line.lower()
+                # Files written before ensure_ascii=False hold \uXXXX escapes; those lines are decoded and checked in full
+                if "\\u" not in line and not any(term in lowered for term in terms):
+                    continue
+                item = json.loads(line)
+                key = (item["kind"], item["id"])
+                if (kind and item["kind"] != kind) or key in seen:
+                    continue
+                tokens = set(tokenize(f"{item['category']} {item['description']} {item['location']}"))
+                score = sum(1 for term in terms if any(token.startswith(term) for token in tokens))
+                if score:
+                    seen.add(key)
+                    hits.append((score, item["timestamp"], item))
+    hits.sort(key=lambda hit: (hit[0], hit[1]), reverse=True)
+    return [item for _, _, item in hits[:limit]]
@@ -0,0 +1,120 @@
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+from .search import tokenize
+
+# Campus Configuration
+GAZETTEER_VERSION = "1"  # bump after editing PLACES so stored reports are re-resolved
+CELL_METRES = 100
+ADJACENT_METRES = 150
+PROXIMITY_METRES = 300  # beyond this two places count as unrelated for matching
+
+Place = namedtuple("Place", ["key", "name", "zone", "x", "y", "aliases"])
+
+# Garden Campus buildings on a local grid in metres (x east, y north of the Main Gate).
+# Positions are approximate; aliases are matched as whole words, longest alias first.
+PLACES = (
+    Place("main_gate", "Main Gate", "entrance", 0, 0, ("gate", "main entrance", "gate 1")),
+    Place("bus_stop", "Bus Stop", "entrance", -60, 20, ("bus stand", "bus point", "university bus")),
+    Place("parking", "Parking Area", "entrance", 70, 40, ("parking", "car park", "bike stand")),
+    Place("admin_block", "Admin Block", "admin", 0, 180, ("admin", "administration", "accounts office", "registrar office")),
+    Place("exam_hall", "Examination Hall", "admin", 90, 220, ("exam hall", "examination")),
+    Place("auditorium", "Auditorium", "admin", -90, 230, ("convocation hall", "seminar hall")),
+    Place("main_library", "Main Library", "library", 0, 330, (
+        "library", "central library", "central lib", "main lib", "lib", "reading room",
+    )),
+    Place("cs_department", "CS Department", "academic", 160, 380, (
+        "cs", "computer science", "cs dept", "it department", "computer lab",
+    )),
+    Place("physics_department", "Physics Department", "academic", 230, 320, ("physics", "physics lab")),
+    Place("chemistry_department", "Chemistry Department", "academic", 230, 450, ("chemistry", "chem lab", "chemistry lab")),
+    Place("pharmacy_department", "Pharmacy Department", "academic", 310, 390, ("pharmacy", "pharmacy lab")),
+    Place("management_sciences", "Management Sciences", "academic", -170, 390, ("management", "business school", "bba", "mba")),
+    Place("law_department", "Law Department", "academic", -230, 450, ("law", "law college")),
+    Place("cafeteria", "Cafeteria", "services", -80, 470, ("cafe", "canteen", "tuck shop", "food court")),
+    Place("mosque", "Mosque", "services", -20, 560, ("masjid", "prayer area")),
+    Place("sports_ground", "Sports Ground", "sports", 350, 600, ("cricket ground", "sports complex", "gym", "playground")),
+    Place("boys_hostel", "Boys Hostel", "hostels", 480, 700, ("boys hostel", "male hostel")),
+    Place("girls_hostel", "Girls Hostel", "hostels", -420, 680, ("girls hostel", "female hostel")),
+)
+PLACES_BY_KEY = {place.key: place for place in PLACES}
+ZONES = tuple(sorted({place.zone for place in PLACES}))
+
+# (alias tokens, place), longest first so "exam hall" beats a shorter alias inside it
+ALIASES = sorted(
+    ((tuple(tokenize(alias)), place) for place in PLACES for alias in (place.name,) + place.aliases),
+    key=lambda entry: -len(entry[0]),
+)
+
+
+@lru_cache(maxsize=10000)
+def resolve(location):
+    """The gazetteer place a free-text location refers to, or None."""
+    tokens = set(tokenize(location))
+    for alias, place in ALIASES:
+        if tokens.issuperset(alias):
+            return place
+    return None
+
+
+def place_key(location):
+    place = resolve(location)
+    return place.key if place else None
+
+
+def distance(a, b):
+    return math.hypot(a.x - b.x, a.y - b.y)
+
+
+class SpatialGrid:
+    """Places bucketed into square cells, so a radius query only looks at the cells it overlaps."""
+
+    def __init__(self, places, cell=CELL_METRES):
+        self.cell = cell
+        self.cells = {}
+        for place in places:
+            self.cells.setdefault(self._cell(place.x, place.y), []).append(place)
+
+    def _cell(self, x, y):
+        return int(x // self.cell), int(y // self.cell)
+
+    def within(self, x, y, radius):
+        """[(place, metres)] within `radius` of (x, y), nearest first."""
+        (x0, y0), (x1, y1) = self._cell(x - radius, y - radius), self._cell(x + radius, y + radius)
+        hits = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for place in self.cells.get((cx, cy), ()):
+                    metres = math.hypot(place.x - x, place.y - y)
+                    if metres <= radius:
+                        hits.append((place, metres))
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+
+GRID = SpatialGrid(PLACES)
+
+
+@lru_cache(maxsize=1024)
+def nearby_keys(key, radius=ADJACENT_METRES):
+    """Keys of the places within `radius` metres of place `key` (itself included), nearest first."""
+    place = PLACES_BY_KEY[key]
+    return tuple(other.key for other, _ in GRID.within(place.x, place.y, radius))
+
+
+def places_near(location, radius=ADJACENT_METRES):
+    """Place keys for a "near" search: a whole zone, or the places around a location; None if unknown."""
+    zone = location.strip().lower()
+    if zone in ZONES:
+        return tuple(place.key for place in PLACES if place.zone == zone)
+    place = resolve(location)
+    return nearby_keys(place.key, radius) if place else None
+
+
+def proximity(a, b):
+    """1.0 for the same building, falling linearly to 0.0 at PROXIMITY_METRES; None if either location is unknown."""
+    place_a, place_b = resolve(a), resolve(b)
+    if place_a is None or place_b is None:
+        return None
+    return max(0.0, 1.0 - distance(place_a, place_b) / PROXIMITY_METRES)
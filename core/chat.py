@@ -0,0 +1,249 @@
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+import traceback
+
+import groq
+from groq import Groq
+
+from . import chat_context, fallback, metrics, retrieval
+from .throttle import RATE_LIMIT_COOLDOWN, ChatLimiter
+
+# Chat Configuration
+CHAT_MODEL = "llama-3.3-70b-versatile"
+MAX_TOKENS = 300
+TEMPERATURE = 0.7
+REQUEST_TIMEOUT = 20
+STREAM_IDLE_TIMEOUT = 45
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# Rate limit errors are not retried: ChatService pauses the limiter and answers locally instead
+RETRYABLE_ERRORS = (
+    groq.APIConnectionError,
+    groq.APITimeoutError,
+    groq.InternalServerError,
+)
+
+SYSTEM_PROMPT = "You are the AWKUM Lost & Found AI Assistant. Be helpful, friendly, and concise. Location: Abdul Wali Khan University Mardan, Pakistan. Help users with lost and found queries, guide them on using the system, and provide relevant information."
+ERROR_REPLY = "❌ I encountered an error. Please check your API key and try again."
+
+
+class ChatError(Exception):
+    pass
+
+
+def create_client(api_key, base_url=None):
+    # Retries are handled in stream_completion so they can back off and stop once tokens flow
+    return Groq(api_key=api_key, base_url=base_url or None, timeout=REQUEST_TIMEOUT, max_retries=0)
+
+
+def backoff_delay(attempt):
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def stream_completion(client, messages, usage=None):
+    """Yield reply text as it streams in, retrying transient failures before the first token.
+
+    If `usage` is a dict it is filled with the provider's token counts when reported.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        started = False
+        try:
+            stream = client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                max_tokens=MAX_TOKENS,
+                temperature=TEMPERATURE,
+                stream=True,
+            )
+            for chunk in stream:
+                x_groq = getattr(chunk, "x_groq", None)
+                if usage is not None and x_groq is not None and x_groq.usage is not None:
+                    usage["prompt_tokens"] = x_groq.usage.prompt_tokens
+                    usage["completion_tokens"] = x_groq.usage.completion_tokens
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    started = True
+                    yield delta
+            return
+        except RETRYABLE_ERRORS:
+            # Once text has been shown a retry would repeat it, so only retry a silent failure
+            if started or attempt == MAX_RETRIES:
+                raise
+            metrics.increment("llm_retries_total")
+            time.sleep(backoff_delay(attempt))
+
+
+def stream_in_background(client, messages, usage=None, idle_timeout=STREAM_IDLE_TIMEOUT):
+    """Run stream_completion on a worker thread; raise ChatError if it goes quiet too long."""
+    chunks = queue.Queue()
+
+    def worker():
+        try:
+            for text in stream_completion(client, messages, usage):
+                chunks.put(("text", text))
+            chunks.put(("done", None))
+        except Exception as e:
+            chunks.put(("error", e))
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        try:
+            event, value = chunks.get(timeout=idle_timeout)
+        except queue.Empty:
+            raise ChatError(f"No response from the AI service in {idle_timeout}s")
+        if event == "done":
+            return
+        if event == "error":
+            raise ChatError(str(value)) from value
+        yield value
+
+
+def flight_key(messages):
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def retry_after(error):
+    """Seconds a 429 response asked us to wait, or the default cooldown."""
+    try:
+        return float(error.response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return RATE_LIMIT_COOLDOWN
+
+
+class ChatService:
+    """Answers chat turns: retrieval grounding, the response cache, the context window and streaming.
+
+    Provider calls go through a ChatLimiter: identical prompts in flight share one call, and when
+    the quota, the concurrency pool or the provider gives out, core.fallback answers from the database.
+    """
+
+    def __init__(self, data, client=None, cache=None, limiter=None):
+        self.data = data
+        self.client = client
+        self.cache = cache
+        self.limiter = limiter or ChatLimiter()
+
+    def reply(self, history, state, on_text=None):
+        """Answer the last user message in `history`; returns (reply, tokens).
+
+        `on_text` is called with the reply so far as it streams in.
+        """
+        message = history[-1]["content"]
+
+        # Ground the reply in the few reports most relevant to this message
+        with metrics.timer("retrieval_seconds"):
+            items = retrieval.retrieve(self.data.store, message, self.data.vector_index)
+        grounding = retrieval.build_context(items)
+        grounding_tokens = chat_context.estimate_tokens(grounding)
+
+        # Opening questions repeat across students; later turns depend on their conversation
+        cacheable = self.cache is not None and len(history) == 1
+        cached = self.cache.get(message, grounding) if cacheable else None
+        if cacheable:
+            metrics.increment("llm_cache_total", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached, {"sent": 0, "received": 0, "cached": True}
+        if self.client is None:
+            return self.local_reply(message, items, "unconfigured", on_text)
+
+        # Recent turns verbatim, older ones as a rolling summary, within the token budget
+        messages, prompt_tokens = chat_context.build_messages(
+            SYSTEM_PROMPT, history, state, budget=chat_context.PROMPT_TOKEN_BUDGET - grounding_tokens,
+        )
+        if grounding:
+            messages.insert(1, {"role": "system", "content": grounding})
+            prompt_tokens += grounding_tokens
+
+        # Students asking the same thing at the same moment share one provider call
+        key = flight_key(messages)
+        flight, leader = self.limiter.flights.join(key)
+        if not leader:
+            metrics.increment("llm_coalesced_total")
+            return self.follow(flight, message, items, on_text)
+        try:
+            return self.complete(messages, prompt_tokens, message, items, grounding if cacheable else None, flight, on_text)
+        finally:
+            self.limiter.flights.finish(key)
+
+    def local_reply(self, message, items, reason, on_text=None):
+        metrics.increment("llm_fallback_total", reason=reason)
+        reply = fallback.local_reply(message, items, reason)
+        if on_text is not None:
+            on_text(reply)
+        return reply, {"sent": 0, "received": 0, "local": True}
+
+    def follow(self, flight, message, items, on_text=None):
+        """Stream another session's identical request as it arrives."""
+        reply = ""
+        try:
+            for text in flight.follow(STREAM_IDLE_TIMEOUT):
+                reply += text
+                if on_text is not None:
+                    on_text(reply)
+        except TimeoutError:
+            return self.local_reply(message, items, "unreachable", on_text)
+        return reply, {"sent": 0, "received": 0, "shared": True}
+
+    def complete(self, messages, prompt_tokens, message, items, cache_grounding, flight, on_text=None):
+        """Call the provider within the limits, publishing the reply to `flight` as it streams."""
+        reply = ""
+
+        def emit(text):
+            nonlocal reply
+            reply += text
+            flight.publish(text)
+            if on_text is not None:
+                on_text(reply)
+
+        reserved = prompt_tokens + MAX_TOKENS
+        refused = self.limiter.acquire(reserved)
+        if refused:
+            local, tokens = self.local_reply(message, items, refused)
+            emit(local)
+            return reply, tokens
+
+        usage = {}
+        outcome = "ok"
+        started = time.perf_counter()
+        try:
+            for text in stream_in_background(self.client, messages, usage):
+                if not reply:
+                    metrics.observe("llm_first_token_seconds", time.perf_counter() - started)
+                emit(text)
+        except Exception as e:
+            outcome = "error"
+            rate_limited = isinstance(e.__cause__, groq.RateLimitError)
+            if rate_limited:
+                # The provider's quota is used up: stop calling it until it says to come back
+                self.limiter.pause(retry_after(e.__cause__))
+            if reply:
+                emit(f"<br><br>{ERROR_REPLY}")
+            else:
+                local, tokens = self.local_reply(message, items, "rate_limited" if rate_limited else "unreachable")
+                emit(local)
+                self.limiter.release(reserved, 0)
+                metrics.observe("llm_request_seconds", time.perf_counter() - started, outcome=outcome)
+                return reply, tokens
+        if outcome == "ok" and cache_grounding is not None:
+            try:
+                self.cache.put(message, cache_grounding, reply)
+            except Exception:
+                traceback.print_exc()  # e.g. chat_cache.db locked; the reply itself was fine
+        tokens = {
+            "sent": usage.get("prompt_tokens", prompt_tokens),
+            "received": usage.get("completion_tokens", chat_context.estimate_tokens(reply)),
+        }
+        self.limiter.release(reserved, tokens["sent"] + tokens["received"])
+        if metrics.ENABLED:
+            metrics.observe("llm_request_seconds", time.perf_counter() - started, outcome=outcome)
+            metrics.increment("llm_tokens_total", tokens["sent"], direction="prompt")
+            metrics.increment("llm_tokens_total", tokens["received"], direction="completion")
+            sent_bytes = sum(len(m["content"].encode("utf-8")) for m in messages)
+            metrics.increment("llm_payload_bytes_total", sent_bytes, direction="sent")
+            metrics.increment("llm_payload_bytes_total", len(reply.encode("utf-8")), direction="received")
+        return reply, tokens
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .embeddings import HashingEncoder
+from .search import tokenize
+
+# Response Cache Configuration
+CHAT_CACHE_PATH = os.environ.get("LOST_FOUND_CHAT_CACHE", "chat_cache.db")
+CACHE_TTL_SECONDS = 24 * 60 * 60
+CACHE_MAX_ENTRIES = 2000
+NEAR_DUPLICATES = os.environ.get("LOST_FOUND_CHAT_CACHE_NEAR_DUPLICATES", "") == "1"
+NEAR_DUPLICATE_THRESHOLD = 0.92
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        context_hash TEXT NOT NULL,
+        prompt TEXT NOT NULL,
+        response TEXT NOT NULL,
+        embedding BLOB,
+        created REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_responses_context ON responses (context_hash, created)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)",
+]
+
+
+def normalize_prompt(prompt):
+    return " ".join(tokenize(prompt))
+
+
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk LLM reply cache with TTL and LRU eviction, optionally matching near-duplicates."""
+
+    def __init__(self, path=CHAT_CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                 near_duplicates=NEAR_DUPLICATES, encoder=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.near_duplicates = near_duplicates
+        self.encoder = encoder or HashingEncoder()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _embed(self, normalized):
+        return self.encoder.encode([normalized])[0]
+
+    def get(self, prompt, context=""):
+        """Cached reply for this prompt and context, or None."""
+        normalized = normalize_prompt(prompt)
+        context_hash = digest(context)
+        now = time.time()
+        fresh_after = now - self.ttl
+        row = self.conn.execute(
+            "SELECT key, response FROM responses WHERE key = ? AND created > ?",
+            (digest(f"{normalized}\n{context_hash}"), fresh_after),
+        ).fetchone()
+        counter = "hits"
+
+        if row is None and self.near_duplicates:
+            rows = self.conn.execute(
+                "SELECT key, response, embedding FROM responses "
+                "WHERE context_hash = ? AND created > ? AND embedding IS NOT NULL",
+                (context_hash, fresh_after),
+            ).fetchall()
+            if rows:
+                matrix = np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+                similarities = matrix @ self._embed(normalized)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= NEAR_DUPLICATE_THRESHOLD:
+                    row, counter = rows[best][:2], "near_hits"
+
+        if row is None:
+            self._count("misses")
+            return None
+        self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, row[0]))
+        self._count(counter)
+        return row[1]
+
+    def put(self, prompt, context, response):
+        normalized = normalize_prompt(prompt)
+        context_hash = digest(context)
+        now = time.time()
+        embedding = self._embed(normalized).tobytes() if self.near_duplicates else None
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, context_hash, prompt, response, embedding, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest(f"{normalized}\n{context_hash}"), context_hash, normalized, response, embedding, now, now),
+            )
+            expired = conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,)).rowcount
+            overflow = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "  SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            ).rowcount
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        with self._lock:
+            self.counters["stores"] += 1
+            self.counters["evictions"] += expired + overflow
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["near_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["hits"] + counters["near_hits"]) / lookups if lookups else 0.0
+        counters["entries"] = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return counters
@@ -0,0 +1,70 @@
+import re
+
+# Context Window Configuration
+KEEP_MESSAGES = 6
+PROMPT_TOKEN_BUDGET = 1500
+SUMMARY_TOKEN_BUDGET = 300
+SUMMARY_WORDS_PER_MESSAGE = 25
+MESSAGE_OVERHEAD_TOKENS = 4
+
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    # Local approximation of a BPE tokenizer: one token per word or symbol, plus one
+    # for every further six characters of a long word.
+    return sum(1 + (len(piece) - 1) // 6 for piece in PIECE_RE.findall(text or ""))
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def new_state():
+    """Per-conversation context state, kept alongside the chat history."""
+    return {"summary": [], "summarized": 0}
+
+
+def summary_line(message):
+    first_sentence = SENTENCE_RE.split(message["content"].strip(), 1)[0]
+    words = first_sentence.split()
+    text = " ".join(words[:SUMMARY_WORDS_PER_MESSAGE]) + (" ..." if len(words) > SUMMARY_WORDS_PER_MESSAGE else "")
+    speaker = "User" if message["role"] == "user" else "Assistant"
+    return f"- {speaker}: {text}"
+
+
+def fold_into_summary(state, messages):
+    """Compress older messages into the rolling extractive summary, oldest lines dropped first."""
+    state["summary"].extend(summary_line(message) for message in messages)
+    while state["summary"] and estimate_tokens("\n".join(state["summary"])) > SUMMARY_TOKEN_BUDGET:
+        state["summary"].pop(0)
+    state["summarized"] += len(messages)
+
+
+def system_message(system_prompt, state):
+    content = system_prompt
+    if state["summary"]:
+        content += "\n\nSummary of the earlier conversation:\n" + "\n".join(state["summary"])
+    return {"role": "system", "content": content}
+
+
+def build_messages(system_prompt, history, state, budget=PROMPT_TOKEN_BUDGET):
+    """API messages for the next turn and their estimated token count.
+
+    The last KEEP_MESSAGES messages are sent verbatim, everything older is represented
+    by the rolling summary, and the oldest verbatim messages are folded in too whenever
+    the prompt would exceed `budget` tokens. Each message is summarized only once.
+    """
+    cutoff = max(state["summarized"], len(history) - KEEP_MESSAGES)
+    if cutoff > state["summarized"]:
+        fold_into_summary(state, history[state["summarized"]:cutoff])
+    recent = [{"role": m["role"], "content": m["content"]} for m in history[state["summarized"]:]]
+
+    system = system_message(system_prompt, state)
+    total = message_tokens(system) + sum(message_tokens(m) for m in recent)
+    while total > budget and len(recent) > 1:
+        fold_into_summary(state, [recent.pop(0)])
+        system = system_message(system_prompt, state)
+        total = message_tokens(system) + sum(message_tokens(m) for m in recent)
+    return [system] + recent, total
@@ -0,0 +1,147 @@
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+# Column Configuration
+INITIAL_CAPACITY = 4096
+LOAD_BATCH = 50000
+SMALL_SELECTION = 8  # up to this many values are matched by comparison, more by lookup table
+EPOCH = date(1970, 1, 1)
+
+# name -> dtype; strings are stored as codes into a per-column Interner
+COLUMNS = {
+    "pk": np.int64,
+    "kind": np.int8,
+    "category": np.int16,
+    "location": np.int32,
+    "place": np.int16,
+    "timestamp": np.int64,  # seconds since the epoch, reading the stored local time as UTC
+    "day": np.int32,  # days since the epoch, so it matches the timestamp's date
+}
+INTERNED = ("kind", "category", "location", "place")
+
+
+def day_number(day):
+    return (date.fromisoformat(day) - EPOCH).days
+
+
+def day_string(number):
+    return (EPOCH + timedelta(days=int(number))).isoformat()
+
+
+class Interner:
+    """Small integer codes for repeated strings; code 0 is reserved for None."""
+
+    def __init__(self):
+        self.codes = {None: 0}
+        self.values = [None]
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ItemTable:
+    """Columnar in-memory mirror of the items table: one numpy array per column.
+
+    Strings become interned codes and timestamps integers, so a report costs a few dozen
+    bytes instead of a dict of strings, and filters and counts run as array operations.
+    Reports are appended by pk as they are written; call refresh() to pick them up.
+    With no store the table starts empty and is filled with append().
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.lock = threading.RLock()
+        self._rebuild()
+
+    def _rebuild(self):
+        self.size = 0
+        self.max_pk = 0
+        self.interners = {name: Interner() for name in INTERNED}
+        self.arrays = {name: np.zeros(INITIAL_CAPACITY, dtype) for name, dtype in COLUMNS.items()}
+        if self.store is not None:
+            self.seen_deletions = self.store.deletions()
+            self._load()
+
+    def _load(self):
+        rows = self.store.column_rows(self.max_pk)
+        while True:
+            batch = rows.fetchmany(LOAD_BATCH)
+            if not batch:
+                return
+            self.append(batch)
+
+    def refresh(self):
+        """Append reports written since the last refresh; rebuild if any were deleted since the last build."""
+        with self.lock:
+            if self.store.deletions() != self.seen_deletions:
+                self._rebuild()
+            else:
+                self._load()
+
+    def append(self, rows):
+        """Add (pk, kind, category, location, place, timestamp) rows, in pk order."""
+        if not rows:
+            return
+        end = self.size + len(rows)
+        if end > len(self.arrays["pk"]):
+            capacity = max(end, 2 * len(self.arrays["pk"]))
+            for name, array in self.arrays.items():
+                grown = np.zeros(capacity, array.dtype)
+                grown[:self.size] = array[:self.size]
+                self.arrays[name] = grown
+        values = dict(zip(("pk", "kind", "category", "location", "place", "timestamp"), zip(*rows)))
+        for name, column in values.items():
+            if name in self.interners:
+                code = self.interners[name].code
+                column = [code(value) for value in column]
+            self.arrays[name][self.size:end] = column
+        self.arrays["day"][self.size:end] = self.arrays["timestamp"][self.size:end] // 86400
+        self.size = end
+        self.max_pk = int(self.arrays["pk"][end - 1])
+
+    def column(self, name):
+        return self.arrays[name][:self.size]
+
+    def isin(self, name, values):
+        """Boolean mask of rows whose `name` is one of `values` (days as ISO strings)."""
+        column = self.column(name)
+        if name == "day":
+            days = sorted({day_number(value) for value in values})
+            if days and days[-1] - days[0] == len(days) - 1:
+                return (column >= days[0]) & (column <= days[-1])
+            codes = days
+        else:
+            interner = self.interners[name]
+            codes = [interner.codes[value] for value in values if value in interner.codes]
+            if len(codes) > SMALL_SELECTION:
+                # One gather through a lookup table beats many comparisons
+                wanted = np.zeros(len(interner.values), bool)
+                wanted[codes] = True
+                return wanted[column]
+        mask = np.zeros(len(column), bool)
+        for code in codes:
+            mask |= column == code
+        return mask
+
+    def value_counts(self, name, mask):
+        """{value: rows} over the rows selected by `mask`, leaving out None."""
+        # np.compress is several times faster than boolean indexing on large arrays
+        column = np.compress(mask, self.column(name))
+        if not len(column):
+            return {}
+        if name == "day":
+            low = int(column.min())
+            counts = np.bincount(column - low)
+            return {day_string(low + offset): int(counts[offset]) for offset in np.flatnonzero(counts)}
+        values = self.interners[name].values
+        counts = np.bincount(column, minlength=len(values))
+        return {values[code]: int(counts[code]) for code in np.flatnonzero(counts) if code}
+
+    def nbytes(self):
+        return sum(array[:self.size].nbytes for array in self.arrays.values())
@@ -0,0 +1,244 @@
+import hashlib
+import hmac
+import secrets
+import threading
+from collections import OrderedDict
+
+from . import matching, metrics, search, stats
+from .jobs import PROCESS_REPORTS
+from .storage import KINDS, LEGACY_JSON_PATH, ItemStore, decode_cursor
+
+# Data Layer Configuration
+MATCH_PKS_CACHE_SIZE = 16  # keyword queries whose full-text hits are kept for facet filtering
+
+# Claim Code Configuration
+CLAIM_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # no 0/O or 1/I to misread
+CLAIM_CODE_LENGTH = 8
+
+
+def new_claim_code():
+    code = "".join(secrets.choice(CLAIM_CODE_ALPHABET) for _ in range(CLAIM_CODE_LENGTH))
+    return f"{code[:4]}-{code[4:]}"
+
+
+def claim_hash(code):
+    normalized = "".join(character for character in code.upper() if character.isalnum())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class DataLayer:
+    """Process-wide services shared by every session, invalidated by the store's data version."""
+
+    def __init__(self, store=None):
+        self.store = store or ItemStore()
+        self.store.migrate_json(LEGACY_JSON_PATH)
+        self.store.backfill_places()
+        if not self.store.get_meta("matches_built"):
+            matching.rebuild_matches(self.store)
+        self._vector_index = None
+        self._images = None
+        self._facets = None
+        self._spelling = None
+        self._lock = threading.Lock()
+        self._version = self.store.version()
+        self._cache = {}
+        self._match_pks = OrderedDict()
+
+    @property
+    def vector_index(self):
+        # numpy and the embedding files are only loaded once something needs them
+        if self._vector_index is None:
+            with self._lock:
+                if self._vector_index is None:
+                    from .embeddings import VectorIndex
+
+                    self._vector_index = VectorIndex(self.store)
+        return self._vector_index
+
+    @property
+    def images(self):
+        if self._images is None:
+            with self._lock:
+                if self._images is None:
+                    from .images import ImageStore
+
+                    self._images = ImageStore(self.store)
+        return self._images
+
+    @property
+    def facets(self):
+        if self._facets is None:
+            with self._lock:
+                if self._facets is None:
+                    from .facets import FacetIndex
+
+                    self._facets = FacetIndex(self.store)
+        return self._facets
+
+    @property
+    def spelling(self):
+        if self._spelling is None:
+            with self._lock:
+                if self._spelling is None:
+                    from .spelling import SpellIndex
+
+                    self._spelling = SpellIndex(self.store)
+        return self._spelling
+
+    def refresh(self):
+        """Drop derived state if any process has written since the last check."""
+        version = self.store.version()
+        if version != self._version:
+            with self._lock:
+                self._cache.clear()
+                self._match_pks.clear()
+                if self._vector_index is not None:
+                    self._vector_index.refresh()
+                if self._images is not None:
+                    self._images.refresh()
+                if self._facets is not None:
+                    self._facets.refresh()
+                if self._spelling is not None:
+                    self._spelling.refresh()
+                self._version = version
+        return version
+
+    def cached(self, key, compute):
+        """Return `compute()` memoized until the data version changes."""
+        self.refresh()
+        name = key[0] if isinstance(key, tuple) else key
+        try:
+            value = self._cache[key]
+        except KeyError:
+            metrics.increment("data_cache_total", key=name, result="miss")
+            value = self._cache[key] = compute()
+            return value
+        metrics.increment("data_cache_total", key=name, result="hit")
+        return value
+
+    def match_pks(self, match):
+        """Pks of every full-text hit for `match`, kept for the few most recent queries until the next write."""
+        import numpy as np
+
+        self.refresh()
+        with self._lock:
+            pks = self._match_pks.get(match)
+            if pks is not None:
+                self._match_pks.move_to_end(match)
+                metrics.increment("data_cache_total", key="match_pks", result="hit")
+                return pks
+        metrics.increment("data_cache_total", key="match_pks", result="miss")
+        pks = np.array(self.store.match_pks(match), dtype=np.int64)
+        with self._lock:
+            self._match_pks[match] = pks
+            while len(self._match_pks) > MATCH_PKS_CACHE_SIZE:
+                self._match_pks.popitem(last=False)
+        return pks
+
+    def count(self, kind):
+        return self.stats()["totals"][kind]
+
+    def stats(self):
+        return self.cached("stats", lambda: stats.snapshot(self.store))
+
+    def best_matches(self, k=10):
+        return self.cached(("best_matches", k), lambda: self.store.best_matches(k))
+
+    def search_page(self, query, kind, semantic=False, cursor=None):
+        if semantic and query:
+            from .embeddings import semantic_page
+
+            return semantic_page(self.vector_index, query, kind, cursor)
+        return search.search_page(self.store, query, kind, cursor)
+
+    def correct(self, query):
+        """(suggested query, expanded search query) with misspelled words corrected."""
+        self.refresh()
+        return self.spelling.correct(query)
+
+    @metrics.timed("search_seconds", mode="facets")
+    def facet_search(self, query, kind, filters, semantic=False, cursor=None):
+        """One page of results narrowed by facet filters, plus live counts for every facet value.
+
+        Counts cover the keyword query too; in semantic mode they cover the filters only.
+        """
+        import numpy as np
+
+        from .facets import matches_filters
+
+        self.refresh()
+        filters = {facet: list(values) for facet, values in filters.items() if values}
+        match = search.build_match_query(query)
+        within = None
+        if match and not semantic:
+            within = self.match_pks(match)
+        pks, counts = self.facets.select(kind, filters, within)
+
+        if not filters:
+            page = self.search_page(query, kind, semantic, cursor)
+        elif semantic and query:
+            from .embeddings import semantic_page
+
+            page = semantic_page(self.vector_index, query, kind, cursor, keep=lambda item: matches_filters(item, filters))
+        elif match:
+            page = search.search_page(self.store, query, kind, cursor, filters=filters)
+        else:
+            # Newest first straight off the selection: the highest pks are the latest reports
+            if cursor:
+                pks = pks[:np.searchsorted(pks, decode_cursor(cursor, int)[0])]
+            pks = pks[::-1][:search.PAGE_SIZE + 1].tolist()
+            next_cursor = str(pks[search.PAGE_SIZE - 1]) if len(pks) > search.PAGE_SIZE else None
+            page = search.Page(self.store.get_items_by_pk(pks[:search.PAGE_SIZE]), next_cursor)
+        return page, counts
+
+    @metrics.timed("report_submit_seconds")
+    def add_report(self, kind, name, contact, category, description, location, image=None):
+        """Save a report, optionally with photo bytes; an unusable photo raises ImageError before anything is saved.
+
+        Matching, embedding and notifications are queued for a background worker (core.jobs).
+        The returned item carries a "claim_code" to show the filer once; only its hash is stored.
+        """
+        saved = self.images.save(image) if image else None
+        code = new_claim_code()
+        item = self.store.add_item(
+            kind, name, contact, category, description, location, job=PROCESS_REPORTS, claim_hash=claim_hash(code),
+        )
+        if saved:
+            self.images.attach(item, saved)
+        item["claim_code"] = code
+        return item
+
+    def add_reports(self, kind, records):
+        """Bulk insert in one transaction, with one queued job for the whole group."""
+        return self.store.add_items(kind, records, job=PROCESS_REPORTS)
+
+    def update_status(self, kind, item_id, status, claim_code=None):
+        """Claim or resolve a report; when `claim_code` is given it must be the code issued with the report.
+
+        Desk staff (the API-key-protected endpoint) pass no code.
+        """
+        if claim_code is not None:
+            stored = self.store.claim_hash(kind, item_id)
+            if not stored or not claim_code.strip() or not hmac.compare_digest(stored, claim_hash(claim_code)):
+                return False
+        return self.store.set_status(kind, item_id, status)
+
+    def archive(self):
+        """Move resolved and stale reports out of the database into the cold archive."""
+        from .archive import archive_reports
+
+        archived = archive_reports(self.store)
+        for kind in KINDS:
+            self.vector_index.remove(kind, [item_id for other, item_id in archived if other == kind])
+        return archived
+
+    def similar_by_photo(self, kind, item_id, k=5):
+        """Reports of the opposite kind whose photos look like this report's, as (item, distance)."""
+        other = "found" if kind == "lost" else "lost"
+        best = {}
+        for _, phash in self.store.item_images(kind, item_id):
+            for other_id, distance in self.images.similar(phash, other, k=k):
+                best[other_id] = min(distance, best.get(other_id, distance))
+        ranked = sorted(best.items(), key=lambda pair: pair[1])[:k]
+        items = {item["id"]: item for item in self.store.get_items(other, [item_id for item_id, _ in ranked])}
+        return [(items[item_id], distance) for item_id, distance in ranked if item_id in items]
@@ -0,0 +1,191 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from . import metrics
+from .search import PAGE_SIZE, Page, tokenize
+from .storage import KINDS, decode_cursor, file_lock
+
+# Embedding Configuration
+EMBEDDINGS_DIR = os.environ.get("LOST_FOUND_EMBEDDINGS_DIR", "embeddings")
+EMBEDDING_MODEL = os.environ.get("LOST_FOUND_EMBEDDING_MODEL", "")
+HASH_DIM = 512
+MIN_SIMILARITY = 0.1
+MAX_SEMANTIC_RESULTS = 200
+
+# Campus vocabulary folded onto the report form categories, so "phone" finds "Mobile"
+SYNONYMS = {
+    "phone": "mobile", "cellphone": "mobile", "smartphone": "mobile", "iphone": "mobile",
+    "android": "mobile", "cell": "mobile", "samsung": "mobile",
+    "purse": "wallet", "billfold": "wallet", "cardholder": "wallet",
+    "key": "keys", "keychain": "keys", "keyring": "keys",
+    "notebook": "laptop", "macbook": "laptop",
+    "backpack": "bag", "rucksack": "bag", "handbag": "bag", "satchel": "bag",
+    "cnic": "card", "identity": "card", "id": "card",
+    "book": "books", "textbook": "books", "register": "books",
+    "adapter": "charger", "adaptor": "charger", "cable": "charger", "powerbank": "charger",
+    "earphones": "headphones", "earbuds": "headphones", "airpods": "headphones",
+    "handsfree": "headphones", "headset": "headphones",
+}
+
+
+def item_text(item):
+    return f"{item['category']} {item['description']} {item['location']}"
+
+
+class HashingEncoder:
+    """Offline fallback: signed feature hashing of words and character n-grams."""
+
+    name = f"hash{HASH_DIM}"
+    dim = HASH_DIM
+
+    def _features(self, text):
+        for token in tokenize(text):
+            token = SYNONYMS.get(token, token)
+            yield f"w:{token}", 1.0
+            padded = f"<{token}>"
+            for n in (3, 4):
+                for i in range(len(padded) - n + 1):
+                    yield f"c:{padded[i:i + n]}", 0.5
+
+    def encode(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+class SentenceEncoder:
+    """Small local transformer model, used when LOST_FOUND_EMBEDDING_MODEL names one."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name.replace("/", "_")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self.model.encode(
+            list(texts), normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def default_encoder():
+    if EMBEDDING_MODEL:
+        try:
+            return SentenceEncoder(EMBEDDING_MODEL)
+        except ImportError:
+            pass
+    return HashingEncoder()
+
+
+class VectorIndex:
+    """Per-kind float32 matrices memory-mapped from disk; row `id - 1` holds report `id`."""
+
+    def __init__(self, store, encoder=None, directory=EMBEDDINGS_DIR):
+        self.store = store
+        self.encoder = encoder or default_encoder()
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._matrices = {}
+        os.makedirs(directory, exist_ok=True)
+        for kind in KINDS:
+            self._open(kind)
+            self.backfill(kind)
+
+    def _path(self, kind):
+        return os.path.join(self.directory, f"{kind}-{self.encoder.name}.f32")
+
+    def _open(self, kind, min_rows=0):
+        path = self._path(kind)
+        row_bytes = self.encoder.dim * 4
+        # Several server processes share these files; growth happens under a lock and
+        # re-reads the size so one process never truncates rows another has added.
+        with file_lock(f"{path}.lock"):
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            rows = size // row_bytes
+            if rows < min_rows or rows == 0:
+                rows = max(min_rows, rows * 2, 1024)
+                with open(path, "ab") as f:
+                    f.truncate(rows * row_bytes)
+        self._matrices[kind] = np.memmap(path, dtype=np.float32, mode="r+", shape=(rows, self.encoder.dim))
+        return self._matrices[kind]
+
+    def _write(self, kind, items):
+        if not items:
+            return
+        vectors = self.encoder.encode([item_text(item) for item in items])
+        with self._lock:
+            matrix = self._matrices[kind]
+            top = max(item["id"] for item in items)
+            if top > matrix.shape[0]:
+                matrix.flush()
+                matrix = self._open(kind, min_rows=top)
+            for item, vector in zip(items, vectors):
+                matrix[item["id"] - 1] = vector
+            matrix.flush()
+
+    def refresh(self):
+        """Remap matrices another process has grown since they were opened."""
+        row_bytes = self.encoder.dim * 4
+        with self._lock:
+            for kind, matrix in self._matrices.items():
+                if os.path.getsize(self._path(kind)) // row_bytes > matrix.shape[0]:
+                    self._open(kind)
+
+    def add(self, item):
+        """Embed one new report; called once per report, never per query."""
+        self._write(item["kind"], [item])
+
+    def add_many(self, kind, items, batch_size=512):
+        for start in range(0, len(items), batch_size):
+            self._write(kind, items[start:start + batch_size])
+
+    def remove(self, kind, item_ids):
+        """Zero the rows of reports that left the database so they never rank again."""
+        with self._lock:
+            matrix = self._matrices[kind]
+            for item_id in item_ids:
+                if item_id <= matrix.shape[0]:
+                    matrix[item_id - 1] = 0
+            matrix.flush()
+
+    def backfill(self, kind, batch_size=512):
+        matrix = self._matrices[kind]
+        filled = set((np.flatnonzero(matrix.any(axis=1)) + 1).tolist())
+        missing = [item_id for item_id in self.store.item_ids(kind) if item_id not in filled]
+        for start in range(0, len(missing), batch_size):
+            ids = missing[start:start + batch_size]
+            self._write(kind, self.store.get_items(kind, ids))
+
+    def query(self, text, kind, k=10):
+        """Top-k (item_id, cosine) pairs via a single matrix-vector product."""
+        q = self.encoder.encode([text])[0]
+        matrix = self._matrices[kind]
+        scores = matrix @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row) + 1, float(scores[row])) for row in top if scores[row] >= MIN_SIMILARITY]
+
+
+@metrics.timed("search_seconds", mode="semantic")
+def semantic_page(index, query, kind, cursor=None, page_size=PAGE_SIZE, keep=None):
+    # Similarity ranks are recomputed per page, so the cursor is simply the rank offset.
+    # `keep(item)` narrows the results (e.g. by facet) before they are paged.
+    offset = decode_cursor(cursor, int)[0] if cursor else 0
+    hits = index.query(query, kind, MAX_SEMANTIC_RESULTS if keep else min(offset + page_size + 1, MAX_SEMANTIC_RESULTS))
+    if keep:
+        items = {item["id"]: item for item in index.store.get_items(kind, [item_id for item_id, _ in hits])}
+        hits = [hit for hit in hits if hit[0] in items and keep(items[hit[0]])]
+    page_hits = hits[offset:offset + page_size]
+    if not keep:
+        items = {item["id"]: item for item in index.store.get_items(kind, [item_id for item_id, _ in page_hits])}
+    next_cursor = str(offset + page_size) if len(hits) > offset + page_size else None
+    return Page([items[item_id] for item_id, _ in page_hits if item_id in items], next_cursor)
@@ -0,0 +1,71 @@
+import numpy as np
+
+from . import metrics
+from .columns import ItemTable
+
+# Facet Configuration
+FACETS = ("category", "location", "day", "place")  # keyed like stats_counters, plus the campus place
+TOP_LOCATIONS = 15
+
+
+def facet_values(item):
+    """An item's key in each facet, normalized the same way as in SQL."""
+    return {
+        "category": item["category"],
+        "location": item["location"].strip(" ").lower(),
+        "day": item["timestamp"][:10],
+        "place": item.get("place"),
+    }
+
+
+def matches_filters(item, filters):
+    values = facet_values(item)
+    return all(values[facet] in selected for facet, selected in filters.items() if selected)
+
+
+class FacetIndex:
+    """Facet filtering and live counts over a columnar copy of the items table (core.columns).
+
+    Filters are vectorized membership tests on interned code columns and counts are one
+    bincount per facet. Memory and time grow with the number of reports, not with the number
+    of distinct locations, which free text keeps adding.
+    """
+
+    def __init__(self, store=None):
+        self.table = ItemTable(store)
+
+    def refresh(self):
+        self.table.refresh()
+
+    @metrics.timed("search_seconds", mode="facet_select")
+    def select(self, kind, filters, within=None):
+        """Ascending pks of matching reports plus live counts per facet value.
+
+        `filters` maps facet -> selected values (ISO days for "day"); `within` optionally limits
+        everything to an array of pks, e.g. full-text matches. Each facet's counts apply every
+        filter except its own, so the other choices in that facet stay visible.
+        """
+        table = self.table
+        with table.lock:
+            base = table.isin("kind", [kind])
+            if within is not None:
+                # The pk column is sorted, so membership is a binary search per pk in `within`
+                pks = table.column("pk")
+                positions = np.searchsorted(pks, within)
+                found = positions < len(pks)
+                found[found] = pks[positions[found]] == within[found]
+                inside = np.zeros(len(pks), bool)
+                inside[positions[found]] = True
+                base &= inside
+            selected = {facet: table.isin(facet, values) for facet, values in filters.items() if values}
+            mask = base.copy()
+            for facet_mask in selected.values():
+                mask &= facet_mask
+            counts = {}
+            for facet in FACETS:
+                others = base.copy()
+                for other, facet_mask in selected.items():
+                    if other != facet:
+                        others &= facet_mask
+                counts[facet] = table.value_counts(facet, others)
+            return table.column("pk")[mask], counts
@@ -0,0 +1,59 @@
+from .retrieval import format_record
+from .search import tokenize
+
+# Fallback Configuration
+MAX_LISTED = 4
+
+NOTES = {
+    "unconfigured": "ℹ️ The AI assistant isn't set up, so this is an automatic answer from the report database.",
+    "rate_limited": "ℹ️ The AI assistant is handling too many questions right now, so this is an automatic answer from the report database.",
+    "busy": "ℹ️ The AI assistant is handling too many questions right now, so this is an automatic answer from the report database.",
+    "unreachable": "ℹ️ The AI assistant can't be reached right now, so this is an automatic answer from the report database.",
+}
+
+# (name, trigger phrases, answer): a rule fires when every word of one phrase is in the message, first rule wins
+RULES = (
+    ("thanks", ("thanks", "thank", "shukriya", "jazakallah"), "You're welcome! Good luck getting your item back."),
+    ("claim", ("claim", "collect", "resolved", "status", "mark returned"),
+     "To claim or close a report, find it on the <strong>Search</strong> page and use <strong>Update status</strong> "
+     "with the claim code shown when the report was submitted. Reports without a claim code are updated at the "
+     "Lost &amp; Found desk."),
+    ("report_found", ("report found", "submit found", "found something", "handed", "hand over"),
+     "Thank you for helping! Open <strong>Report Found</strong> and enter the category, a description, where you "
+     "found it and your contact number. A photo helps the owner recognise it."),
+    ("report_lost", ("report", "register lost", "file"),
+     "Open <strong>Report Lost</strong> and enter the category, a description, where you lost it and your contact "
+     "number. A photo helps. If a matching found item is reported, you'll see a notification here."),
+    ("search", ("search", "filter", "how find"),
+     "Use the <strong>Search</strong> page: Keyword mode for exact words, Fuzzy for typos and Semantic for related "
+     "words. Filters narrow by category, date and how near a building it was reported."),
+    ("greeting", ("hi", "hello", "hey", "salam", "assalam", "aoa"),
+     "Hello! I can help you look for lost items and report found ones."),
+)
+TRIGGERS = [(name, [set(tokenize(phrase)) for phrase in phrases], answer) for name, phrases, answer in RULES]
+
+
+def intent(message):
+    words = set(tokenize(message))
+    for name, phrases, answer in TRIGGERS:
+        if any(phrase <= words for phrase in phrases):
+            return name, answer
+    return None, None
+
+
+def local_reply(message, items, reason):
+    """A rules-based answer listing the most relevant reports, for when the AI can't be used."""
+    name, answer = intent(message)
+    parts = [NOTES[reason]]
+    if answer:
+        parts.append(answer)
+    if name not in ("thanks", "greeting"):
+        if items:
+            parts.append("These reports may be relevant:<br>" + "<br>".join(
+                f"• {format_record(item)}" for item in items[:MAX_LISTED]
+            ))
+            parts.append("Contact details are on the <strong>Search</strong> page.")
+        elif not answer:
+            parts.append("No reports match that yet. Try the <strong>Search</strong> page with other words, "
+                         "or file a report so whoever finds it can reach you.")
+    return "<br><br>".join(parts)
@@ -0,0 +1,161 @@
+import hashlib
+import io
+import os
+import threading
+
+from PIL import Image, ImageOps
+
+from .storage import KINDS
+
+# Image Configuration
+IMAGES_DIR = os.environ.get("LOST_FOUND_IMAGES_DIR", "images")
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 80
+HASH_SIZE = 8
+MAX_HASH_DISTANCE = 12
+SIMILAR_RESULTS = 5
+
+
+class ImageError(Exception):
+    pass
+
+
+def dhash(image, size=HASH_SIZE):
+    """64-bit difference hash: whether each pixel of a tiny greyscale copy is brighter than its right neighbour."""
+    pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return bits
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over hashes under Hamming distance.
+
+    Each child hangs off its distance to the parent, so by the triangle inequality a
+    radius-r query only descends into children at distance d-r..d+r.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, key, value):
+        self.size += 1
+        if self.root is None:
+            self.root = (key, [value], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (key, [value], {})
+                return
+            node = child
+
+    def search(self, key, radius):
+        """(distance, value) pairs within `radius` of `key`, nearest first."""
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_key, values, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= radius:
+                results.extend((distance, value) for value in values)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        results.sort(key=lambda pair: pair[0])
+        return results
+
+
+def write_file(path, data):
+    # Write then rename, so a concurrent reader or a second uploader never sees half a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+class ImageStore:
+    """Photos on disk, content-addressed by SHA-256, with an in-memory BK-tree of their hashes per kind."""
+
+    def __init__(self, store, directory=IMAGES_DIR):
+        self.store = store
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._trees = {kind: BKTree() for kind in KINDS}
+        self._seq = 0
+        self._seen_deletions = store.deletions()
+        self.refresh()
+
+    def path(self, sha256, thumbnail=False):
+        if thumbnail:
+            return os.path.join(self.directory, "thumbnails", sha256[:2], f"{sha256}.jpg")
+        return os.path.join(self.directory, "originals", sha256[:2], sha256)
+
+    def save(self, data):
+        """Store an upload once, with its thumbnail; returns (sha256, phash, width, height).
+
+        Raises ImageError before anything is written if the upload is not a usable image.
+        """
+        if len(data) > MAX_IMAGE_BYTES:
+            raise ImageError(f"Photos must be under {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except (OSError, Image.DecompressionBombError) as e:
+            raise ImageError("That file is not a supported image") from e
+        image = ImageOps.exif_transpose(image)
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self.path(sha256)):
+            write_file(self.path(sha256), data)
+        if not os.path.exists(self.path(sha256, thumbnail=True)):
+            thumbnail = image.convert("RGB")
+            thumbnail.thumbnail(THUMBNAIL_SIZE)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, "JPEG", quality=THUMBNAIL_QUALITY)
+            write_file(self.path(sha256, thumbnail=True), buffer.getvalue())
+        return sha256, f"{dhash(image):016x}", image.width, image.height
+
+    def attach(self, item, saved):
+        sha256, phash, width, height = saved
+        self.store.attach_image(item["kind"], item["id"], sha256, phash, width, height)
+        self.refresh()
+
+    def refresh(self):
+        """Index attachments made since the last refresh, by this or any other process.
+
+        BK-trees can't drop entries, so once reports have been archived the trees are rebuilt.
+        """
+        with self._lock:
+            deletions = self.store.deletions()
+            if deletions != self._seen_deletions:
+                self._trees = {kind: BKTree() for kind in KINDS}
+                self._seq = 0
+                self._seen_deletions = deletions
+            for seq, kind, item_id, phash in self.store.images_since(self._seq):
+                self._trees[kind].add(int(phash, 16), item_id)
+                self._seq = seq
+
+    def similar(self, phash, kind, radius=MAX_HASH_DISTANCE, k=SIMILAR_RESULTS):
+        """Up to k (item_id, distance) reports of `kind` with a photo close to `phash`."""
+        with self._lock:
+            hits = self._trees[kind].search(int(phash, 16), radius)
+        best = {}
+        for distance, item_id in hits:
+            best.setdefault(item_id, distance)
+        return sorted(best.items(), key=lambda pair: pair[1])[:k]
@@ -0,0 +1,104 @@
+import os
+import socket
+import threading
+import time
+import traceback
+
+from . import matching, metrics
+from .archive import ARCHIVE_INTERVAL_SECONDS
+
+# Worker Configuration
+WORKER_MODE = os.environ.get("LOST_FOUND_WORKER", "thread")  # "thread" or "external" (run worker.py)
+POLL_INTERVAL = 0.5
+JOB_LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 2
+NOTIFY_MIN_SCORE = 0.5
+
+# Job types
+PROCESS_REPORTS = "process_reports"
+
+
+def notification_message(lost, found):
+    return (
+        f"A {found['category']} was found at {found['location']} (FOUND-{found['id']}, "
+        f"reported {found['timestamp']}) that may be your LOST-{lost['id']}."
+    )
+
+
+def process_reports(data, kind, ids):
+    """Match and embed newly submitted reports, then tell lost report owners about strong matches."""
+    store = data.store
+    items = store.get_items(kind, ids)
+    pairs = matching.update_matches_many(store, items)
+    data.vector_index.add_many(kind, items)
+
+    strong = [(lost_id, found_id, score) for lost_id, found_id, score in pairs if score >= NOTIFY_MIN_SCORE]
+    if strong:
+        lost = {item["id"]: item for item in store.get_items("lost", sorted({pair[0] for pair in strong}))}
+        found = {item["id"]: item for item in store.get_items("found", sorted({pair[1] for pair in strong}))}
+        store.add_notifications([
+            ("lost", lost_id, found_id, score, notification_message(lost[lost_id], found[found_id]))
+            for lost_id, found_id, score in strong
+            if lost_id in lost and found_id in found
+        ])
+    store.maybe_snapshot()
+
+
+HANDLERS = {
+    PROCESS_REPORTS: lambda data, payload: process_reports(data, payload["kind"], payload["ids"]),
+}
+
+
+class Worker:
+    """Claims jobs from the SQLite queue; any number may run, in any number of processes."""
+
+    def __init__(self, data, name=None):
+        self.data = data
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.stopping = threading.Event()
+
+    def run_once(self):
+        """Run one job if any is ready; returns whether one was run."""
+        job = self.data.store.claim_job(self.name, JOB_LEASE_SECONDS)
+        if job is None:
+            # Idle: at most once a day, one worker moves old reports to the archive
+            if self.data.store.claim_run("archived_at", ARCHIVE_INTERVAL_SECONDS):
+                try:
+                    self.data.archive()
+                except Exception:
+                    traceback.print_exc()  # retried at the next interval; reports stay in the database
+            return False
+        started = time.perf_counter()
+        try:
+            HANDLERS[job["type"]](self.data, job["payload"])
+        except Exception:
+            error = traceback.format_exc(limit=5)
+            retry_in = RETRY_BASE_SECONDS * 2 ** job["attempts"] if job["attempts"] < MAX_ATTEMPTS else None
+            self.data.store.fail_job(job["id"], error, retry_in)
+            metrics.increment("jobs_total", type=job["type"], outcome="failed")
+        else:
+            self.data.store.finish_job(job["id"])
+            metrics.increment("jobs_total", type=job["type"], outcome="done")
+        metrics.observe("job_seconds", time.perf_counter() - started, type=job["type"])
+        return True
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                metrics.maybe_write_file()
+                if self.run_once():
+                    continue
+            except Exception:
+                # e.g. "database is locked" past the busy timeout; a lost lease is picked up again later
+                traceback.print_exc()
+            self.stopping.wait(POLL_INTERVAL)
+
+    def stop(self):
+        self.stopping.set()
+
+
+def start_thread(data):
+    worker = Worker(data)
+    threading.Thread(target=worker.run, name="lost-found-worker", daemon=True).start()
+    return worker
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from . import campus
+from .search import tokenize
+from .storage import TIMESTAMP_FORMAT
+
+# Matching Configuration
+MATCH_WINDOW_DAYS = 30
+MAX_CANDIDATES = 200
+MIN_SCORE = 0.25
+MATCHES_PER_ITEM = 10
+WEIGHTS = {"description": 0.6, "location": 0.25, "category": 0.15}
+FEATURE_CACHE_SIZE = 50000
+
+
+# The same candidates recur across neighbouring reports, so their features are memoized by text
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def trigrams(text):
+    padded = f"  {' '.join(tokenize(text))} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def location_tokens(text):
+    return frozenset(tokenize(text))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def location_similarity(a, b):
+    # Campus places compare by distance, so "central lib" matches "Main Library" and neighbouring
+    # buildings score partially; unknown places fall back to shared words
+    nearness = campus.proximity(a, b)
+    if nearness is not None:
+        return nearness
+    return jaccard(location_tokens(a), location_tokens(b))
+
+
+def score_pair(lost, found):
+    score = WEIGHTS["description"] * jaccard(trigrams(lost["description"]), trigrams(found["description"]))
+    score += WEIGHTS["location"] * location_similarity(lost["location"], found["location"])
+    if lost["category"] == found["category"]:
+        score += WEIGHTS["category"]
+    return round(score, 4)
+
+
+def time_window(timestamp):
+    moment = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    delta = timedelta(days=MATCH_WINDOW_DAYS)
+    return (moment - delta).strftime(TIMESTAMP_FORMAT), (moment + delta).strftime(TIMESTAMP_FORMAT)
+
+
+def find_matches(store, item):
+    """Score `item` against the blocked candidates of the opposite kind, best first."""
+    other_kind = "found" if item["kind"] == "lost" else "lost"
+    start, end = time_window(item["timestamp"])
+    location_match = " OR ".join(f'"{token}"' for token in tokenize(item["location"]))
+    place = campus.resolve(item["location"])
+    places = campus.nearby_keys(place.key, campus.PROXIMITY_METRES) if place else None
+    candidates = store.block_candidates(
+        other_kind, start, end, item["category"], location_match, MAX_CANDIDATES, places
+    )
+    scored = []
+    for candidate in candidates:
+        lost, found = (item, candidate) if item["kind"] == "lost" else (candidate, item)
+        score = score_pair(lost, found)
+        if score >= MIN_SCORE:
+            scored.append((lost["id"], found["id"], score))
+    scored.sort(key=lambda pair: pair[2], reverse=True)
+    return scored[:MATCHES_PER_ITEM]
+
+
+def update_matches(store, item):
+    """Match a newly reported item incrementally; only its own candidate block is scanned."""
+    pairs = find_matches(store, item)
+    if pairs:
+        store.save_matches(pairs)
+    return pairs
+
+
+def update_matches_many(store, items):
+    """Match a batch of new reports, saving all their pairs in one transaction."""
+    pairs = [pair for item in items for pair in find_matches(store, item)]
+    if pairs:
+        store.save_matches(pairs)
+    return pairs
+
+
+def rebuild_matches(store):
+    """Backfill matches for every lost report, e.g. after importing legacy data."""
+    total = 0
+    for item in store.list_items("lost"):
+        total += len(update_matches(store, item))
+    store.set_meta("matches_built", "1")
+    return total
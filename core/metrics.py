@@ -0,0 +1,186 @@
+"""Counters, latency histograms and an opt-in profiler; all no-ops unless LOST_FOUND_METRICS=1."""
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+
+# Metrics Configuration
+ENABLED = os.environ.get("LOST_FOUND_METRICS", "") == "1"
+METRICS_FILE = os.environ.get("LOST_FOUND_METRICS_FILE", "")  # may contain {pid}
+METRICS_FILE_INTERVAL = 10
+PROFILE = os.environ.get("LOST_FOUND_PROFILE", "")  # "cprofile" or "pyinstrument"
+PROFILE_DIR = os.environ.get("LOST_FOUND_PROFILE_DIR", "profiles")
+PROFILE_TOP = 25
+PREFIX = "lost_found_"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_last_written = [0.0]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """Context manager observing the block's duration in seconds."""
+    return _Timer(name, labels) if ENABLED else NULL_TIMER
+
+
+def timed(name, **labels):
+    """Decorator observing each call's duration; leaves the function untouched when metrics are off."""
+    def decorate(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started, **labels)
+        return wrapper
+    return decorate
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def render():
+    """Everything recorded so far in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(buckets), total, count)) for key, (buckets, total, count) in _histograms.items())
+    lines = []
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            typed.add(name)
+        lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+    for (name, labels), (buckets, total, count) in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total:.6f}")
+        lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path=None):
+    """Write render() atomically, e.g. for node_exporter's textfile collector."""
+    path = (path or METRICS_FILE).format(pid=os.getpid())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(render())
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def maybe_write_file():
+    """write_file() at most every METRICS_FILE_INTERVAL seconds, when LOST_FOUND_METRICS_FILE is set."""
+    if not (ENABLED and METRICS_FILE) or time.time() - _last_written[0] < METRICS_FILE_INTERVAL:
+        return None
+    _last_written[0] = time.time()
+    return write_file()
+
+
+def start_profile():
+    """Start profiling the calling thread if LOST_FOUND_PROFILE is set; pass the result to finish_profile."""
+    if not PROFILE:
+        return None
+    if PROFILE == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            pass
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def finish_profile(profiler, name="rerun"):
+    """Stop and save a profile under PROFILE_DIR; returns (path, text summary), or None when not profiling."""
+    if profiler is None:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(f"{path}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return f"{path}.prof", summary.getvalue()
+    profiler.stop()
+    with open(f"{path}.html", "w") as f:
+        f.write(profiler.output_html())
+    return f"{path}.html", profiler.output_text()
@@ -0,0 +1,58 @@
+from .chat_context import estimate_tokens
+from .search import build_match_query
+from .storage import KINDS
+
+# Retrieval Configuration
+RETRIEVAL_K = 6
+CONTEXT_TOKEN_BUDGET = 400
+DESCRIPTION_CHARS = 160
+
+CONTEXT_HEADER = "Reports currently in the AWKUM Lost & Found database that may be relevant. Refer to them by ID; contact details are shown on the Search page. If none fit, say so rather than guessing."
+
+
+def retrieve(store, query, vector_index=None, k=RETRIEVAL_K):
+    """Top-k lost and found reports for a chat message: BM25 hits first, then semantic ones."""
+    match = build_match_query(query)
+    ranked = []
+    for kind in KINDS:
+        if match:
+            ranked.append(store.search(kind, match, k))
+        if vector_index is not None:
+            hits = vector_index.query(query, kind, k)
+            by_id = {item["id"]: item for item in store.get_items(kind, [item_id for item_id, _ in hits])}
+            ranked.append([by_id[item_id] for item_id, _ in hits if item_id in by_id])
+
+    # Round-robin over the ranked lists so both kinds and both rankers get a fair share
+    results, seen = [], set()
+    for position in range(k):
+        for items in ranked:
+            if position < len(items):
+                key = (items[position]["kind"], items[position]["id"])
+                if key not in seen:
+                    seen.add(key)
+                    results.append(items[position])
+    return results[:k]
+
+
+def format_record(item):
+    description = item["description"]
+    if len(description) > DESCRIPTION_CHARS:
+        description = description[:DESCRIPTION_CHARS] + "..."
+    return (
+        f"[{item['kind'].upper()}-{item['id']}] {item['category']}: {description} | "
+        f"Location: {item['location']} | Reported: {item['timestamp'][:10]}"
+    )
+
+
+def build_context(items, budget=CONTEXT_TOKEN_BUDGET):
+    """System message text with as many records as fit in `budget` tokens, or "" if none."""
+    lines = [CONTEXT_HEADER]
+    used = estimate_tokens(CONTEXT_HEADER)
+    for item in items:
+        line = format_record(item)
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines) if len(lines) > 1 else ""
@@ -0,0 +1,48 @@
+import re
+from collections import namedtuple
+
+from . import metrics
+
+PAGE_SIZE = 10
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Function words that would otherwise match most reports in a conversational query
+STOPWORDS = frozenset(
+    "a an and any anyone anybody are at be by can did do does for found from has have i "
+    "in is it lost me my near of on or please some someone somebody the this to was where "
+    "who with you your".split()
+)
+
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def keywords(text):
+    tokens = tokenize(text)
+    return [token for token in tokens if token not in STOPWORDS] or tokens
+
+
+def build_match_query(query):
+    # Every token is quoted so user input can never be parsed as FTS5 syntax, and
+    # prefix-matched so results keep up while the user is still typing.
+    # Terms are OR-ed: BM25 ranks items matching more of them first.
+    return " OR ".join(f'"{token}"*' for token in keywords(query))
+
+
+def search_items(store, query, kind, limit=-1):
+    match = build_match_query(query)
+    if not match:
+        return store.list_items(kind, limit)
+    return store.search(kind, match, limit)
+
+
+@metrics.timed("search_seconds", mode="keyword")
+def search_page(store, query, kind, cursor=None, page_size=PAGE_SIZE, filters=None):
+    """One page of results; pass the returned next_cursor back in for the following page."""
+    match = build_match_query(query)
+    if not match:
+        return Page(*store.list_page(kind, cursor, page_size))
+    return Page(*store.search_page(kind, match, cursor, page_size, filters))
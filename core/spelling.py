@@ -0,0 +1,133 @@
+import bisect
+import threading
+
+from . import metrics
+from .search import STOPWORDS, tokenize
+
+# Spelling Configuration
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+EXPANSIONS = 3
+
+
+def deletes(word, distance, prefix_length=PREFIX_LENGTH):
+    """Every string reachable from word's prefix by deleting up to `distance` characters."""
+    word = word[:prefix_length]
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps cost 1), or limit + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_distance(term):
+    return 1 if len(term) < 5 else MAX_EDIT_DISTANCE
+
+
+class SpellIndex:
+    """SymSpell-style deletion dictionary over the words used in reports.
+
+    Each vocabulary word is filed under all its deletions (up to two), so a misspelling is
+    looked up by generating its own deletions: the cost depends on the word's length, not
+    on how many reports or words there are.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    def _rebuild(self):
+        self.counts = {}
+        self.deletions = {}
+        self.sorted_words = []
+        self.max_pk = 0
+        self.size = 0
+        self.seen_deletions = self.store.deletions()
+        self._load()
+
+    def _load(self):
+        added = False
+        for pk, category, description, location in self.store.text_rows(self.max_pk):
+            for word in tokenize(f"{category} {description} {location}"):
+                if len(word) < MIN_WORD_LENGTH or word.isdigit():
+                    continue
+                if word not in self.counts:
+                    self.counts[word] = 0
+                    for variant in deletes(word, MAX_EDIT_DISTANCE):
+                        self.deletions.setdefault(variant, []).append(word)
+                    added = True
+                self.counts[word] += 1
+            self.max_pk = pk
+            self.size += 1
+        if added:
+            self.sorted_words = sorted(self.counts)
+
+    def refresh(self):
+        with self._lock:
+            if self.store.deletions() != self.seen_deletions:
+                self._rebuild()
+            else:
+                self._load()
+
+    def is_prefix(self, term):
+        position = bisect.bisect_left(self.sorted_words, term)
+        return position < len(self.sorted_words) and self.sorted_words[position].startswith(term)
+
+    def suggestions(self, term):
+        """Known words within edit distance of `term`, closest and most common first."""
+        limit = max_distance(term)
+        candidates = set()
+        for variant in deletes(term, limit):
+            candidates.update(self.deletions.get(variant, ()))
+        scored = []
+        for word in candidates:
+            distance = edit_distance(term, word, limit)
+            if distance <= limit:
+                scored.append((distance, -self.counts[word], word))
+        scored.sort()
+        return [(word, distance) for distance, _, word in scored]
+
+    @metrics.timed("search_seconds", mode="fuzzy_correct")
+    def correct(self, query):
+        """(suggested query, expanded search query); both equal the input when nothing needed fixing.
+
+        Known words and prefixes of known words are kept, so results still update while typing.
+        Misspelled terms become their best correction, searched alongside the next-closest ones.
+        """
+        suggested, expanded = [], []
+        with self._lock:
+            for term in tokenize(query):
+                if len(term) < MIN_WORD_LENGTH or term in STOPWORDS or term.isdigit() or self.is_prefix(term):
+                    suggested.append(term)
+                    expanded.append(term)
+                    continue
+                matches = self.suggestions(term)
+                if not matches:
+                    suggested.append(term)
+                    expanded.append(term)
+                    continue
+                best = matches[0][1]
+                suggested.append(matches[0][0])
+                expanded += [word for word, distance in matches[:EXPANSIONS] if distance == best]
+        return " ".join(suggested), " ".join(expanded)
@@ -0,0 +1,30 @@
+from . import metrics
+
+RECENT_ACTIVITY_SIZE = 10
+TOP_LOCATIONS = 10
+DAYS_SHOWN = 30
+
+
+def totals(store):
+    return store.counters("total").get("", {"lost": 0, "found": 0})
+
+
+def breakdown(store, dimension, limit=None, by_key=False):
+    """[(key, lost, found)] for a counter dimension, busiest first (or in key order)."""
+    rows = [(key, counts["lost"], counts["found"]) for key, counts in store.counters(dimension).items()]
+    if by_key:
+        rows.sort()
+    else:
+        rows.sort(key=lambda row: (-(row[1] + row[2]), row[0]))
+    return rows[:limit] if limit else rows
+
+
+@metrics.timed("stats_seconds")
+def snapshot(store):
+    """Everything the Statistics page renders; a handful of indexed reads regardless of size."""
+    return {
+        "totals": totals(store),
+        "categories": breakdown(store, "category"),
+        "locations": breakdown(store, "location", TOP_LOCATIONS),
+        "days": breakdown(store, "day", by_key=True)[-DAYS_SHOWN:],
+    }
@@ -0,0 +1,917 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import campus, metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+# Storage Configuration
+DB_PATH = os.environ.get("LOST_FOUND_DB", "lost_found.db")
+LEGACY_JSON_PATH = "lost_found_data.json"
+# FULL fsyncs the WAL on every commit, so an acknowledged report survives a power cut
+SYNCHRONOUS = os.environ.get("LOST_FOUND_DB_SYNCHRONOUS", "FULL").upper()
+SNAPSHOT_DIR = os.environ.get("LOST_FOUND_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_EVERY_WRITES = 500
+SNAPSHOT_KEEP = 5
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+RANKING_CACHE_SIZE = 16  # ranked pk lists kept so pagers of keyword searches see a fixed order
+KINDS = ("lost", "found")
+STATUSES = ("open", "claimed", "resolved")
+CATEGORIES = ("Mobile", "Wallet", "Keys", "Laptop", "Bag", "ID Card", "Books", "Charger", "Headphones", "Other")
+ITEM_FIELDS = ("id", "name", "contact", "category", "description", "location", "timestamp")
+
+# Counter dimensions for stats_counters as (name, SQL key expression over the item row)
+STATS_DIMENSIONS = (
+    ("total", "''"),
+    ("category", "{row}.category"),
+    ("location", "lower(trim({row}.location))"),
+    ("day", "substr({row}.timestamp, 1, 10)"),
+)
+
+
+def stats_trigger(name, event, *changes):
+    """Trigger applying (row alias, delta) changes to every counter dimension."""
+    statements = "".join(
+        f"INSERT INTO stats_counters (dimension, key, kind, n) "
+        f"VALUES ('{dimension}', {key.format(row=row)}, {row}.kind, {delta}) "
+        f"ON CONFLICT (dimension, key, kind) DO UPDATE SET n = n + ({delta});\n"
+        for row, delta in changes
+        for dimension, key in STATS_DIMENSIONS
+    )
+    return f"CREATE TRIGGER items_stats_{name} {event} ON items BEGIN\n{statements}END"
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Never edit an entry that has shipped - append a new one instead.
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE items (
+            pk INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            contact TEXT NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT NOT NULL,
+            location TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            UNIQUE (kind, id)
+        )
+        """,
+        "CREATE INDEX idx_items_timestamp ON items (timestamp)",
+        "CREATE TABLE sequences (kind TEXT PRIMARY KEY, next_id INTEGER NOT NULL)",
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    ],
+    [
+        # Full-text inverted index over the searchable fields, kept in sync by triggers
+        """
+        CREATE VIRTUAL TABLE items_fts USING fts5 (
+            description, category, location,
+            content = 'items', content_rowid = 'pk',
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, description, category, location)
+            VALUES (new.pk, new.description, new.category, new.location);
+        END
+        """,
+        """
+        CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, description, category, location)
+            VALUES ('delete', old.pk, old.description, old.category, old.location);
+        END
+        """,
+        """
+        CREATE TRIGGER items_fts_update AFTER UPDATE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, description, category, location)
+            VALUES ('delete', old.pk, old.description, old.category, old.location);
+            INSERT INTO items_fts (rowid, description, category, location)
+            VALUES (new.pk, new.description, new.category, new.location);
+        END
+        """,
+        "INSERT INTO items_fts (items_fts) VALUES ('rebuild')",
+    ],
+    [
+        # Candidate blocking for lost/found matching, plus the computed match pairs
+        "CREATE INDEX idx_items_block ON items (kind, category, timestamp)",
+        """
+        CREATE TABLE matches (
+            lost_id INTEGER NOT NULL,
+            found_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            created TEXT NOT NULL,
+            PRIMARY KEY (lost_id, found_id)
+        )
+        """,
+        "CREATE INDEX idx_matches_found ON matches (found_id, score)",
+        "CREATE INDEX idx_matches_score ON matches (score)",
+    ],
+    [
+        # Data version, bumped on every write so process-wide caches know when to refresh
+        "INSERT INTO meta (key, value) VALUES ('data_version', 0)",
+    ] + [
+        f"""
+        CREATE TRIGGER {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+        END
+        """
+        for table in ("items", "matches")
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ],
+    [
+        # Running report counters per kind, maintained on write instead of recounted on render
+        """
+        CREATE TABLE stats_counters (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (dimension, key, kind)
+        )
+        """,
+        stats_trigger("insert", "AFTER INSERT", ("new", 1)),
+        stats_trigger("delete", "AFTER DELETE", ("old", -1)),
+        stats_trigger("update", "AFTER UPDATE OF kind, category, location, timestamp", ("old", -1), ("new", 1)),
+    ] + [
+        f"INSERT INTO stats_counters (dimension, key, kind, n) "
+        f"SELECT '{dimension}', {key.format(row='items')}, kind, COUNT(*) FROM items GROUP BY 2, kind"
+        for dimension, key in STATS_DIMENSIONS
+    ],
+    [
+        # Photos, stored on disk by SHA-256, and the reports they are attached to
+        """
+        CREATE TABLE images (
+            sha256 TEXT PRIMARY KEY,
+            phash TEXT NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            created TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE item_images (
+            seq INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            UNIQUE (kind, item_id, sha256)
+        )
+        """,
+        """
+        CREATE TRIGGER item_images_version_insert AFTER INSERT ON item_images BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+        END
+        """,
+    ],
+    [
+        # Background job queue, claimed by workers under a lease, and the notifications they write
+        """
+        CREATE TABLE jobs (
+            id INTEGER PRIMARY KEY,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_after REAL NOT NULL,
+            claimed_by TEXT,
+            error TEXT,
+            created TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX idx_jobs_ready ON jobs (status, run_after)",
+        """
+        CREATE TABLE notifications (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            match_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            message TEXT NOT NULL,
+            created TEXT NOT NULL,
+            UNIQUE (kind, item_id, match_id)
+        )
+        """,
+    ],
+    [
+        # Report lifecycle (open -> claimed -> resolved); status changes no longer reindex FTS
+        "ALTER TABLE items ADD COLUMN status TEXT NOT NULL DEFAULT 'open'",
+        "ALTER TABLE items ADD COLUMN status_changed TEXT",
+        "CREATE INDEX idx_items_status ON items (status, status_changed)",
+        "DROP TRIGGER items_fts_update",
+        """
+        CREATE TRIGGER items_fts_update AFTER UPDATE OF description, category, location ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, description, category, location)
+            VALUES ('delete', old.pk, old.description, old.category, old.location);
+            INSERT INTO items_fts (rowid, description, category, location)
+            VALUES (new.pk, new.description, new.category, new.location);
+        END
+        """,
+    ],
+    [
+        # Canonical campus place of each report (core.campus); older rows are filled in by backfill_places
+        "ALTER TABLE items ADD COLUMN place TEXT",
+        "CREATE INDEX idx_items_place ON items (kind, place, timestamp)",
+    ],
+    [
+        # SHA-256 of the claim code shown once to whoever filed the report; NULL for older reports
+        "ALTER TABLE items ADD COLUMN claim_hash TEXT",
+    ],
+]
+
+# BM25 column weights for items_fts: description, category, location
+FTS_WEIGHTS = (1.0, 2.0, 1.5)
+
+
+class StorageError(Exception):
+    pass
+
+
+class CursorError(ValueError):
+    pass
+
+
+def latest_snapshot(directory=SNAPSHOT_DIR):
+    snapshots = sorted(glob.glob(os.path.join(directory, "lost_found-*.db")))
+    return snapshots[-1] if snapshots else None
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive cross-process lock on `path` (advisory flock), for files SQLite doesn't guard."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def now_timestamp():
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def row_to_item(row):
+    item = {field: row[field] for field in ITEM_FIELDS}
+    item["kind"] = row["kind"]
+    item["status"] = row["status"]
+    item["place"] = row["place"]
+    return item
+
+
+def filter_clause(filters, row="items"):
+    """SQL conditions (with params) restricting `row` to the selected values of each facet."""
+    expressions = dict(STATS_DIMENSIONS, place="{row}.place")
+    conditions, params = [], []
+    for dimension, values in sorted(filters.items()):
+        if values:
+            conditions.append(f"{expressions[dimension].format(row=row)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    return "".join(f" AND {condition}" for condition in conditions), tuple(params)
+
+
+# Keyset pagination: a cursor is the sort key of the last row on the previous page,
+# so every page is an index range scan and rows never shift between pages.
+# Ranked keyword search can't key on its score, and pages a pinned ranking instead (search_page).
+def encode_cursor(*key):
+    return "|".join(repr(part) if isinstance(part, float) else str(part) for part in key)
+
+
+def decode_cursor(cursor, *types):
+    """The parts of a cursor made by encode_cursor; CursorError if it wasn't one."""
+    parts = cursor.split("|", len(types) - 1)
+    try:
+        if len(parts) != len(types):
+            raise ValueError
+        return tuple(cast(part) for cast, part in zip(types, parts))
+    except ValueError:
+        raise CursorError(f"Invalid cursor: {cursor!r}") from None
+
+
+def page_rows(rows, limit, key):
+    """Split `limit + 1` fetched rows into (items, next_cursor)."""
+    rows = list(rows)
+    next_cursor = encode_cursor(*key(rows[limit - 1])) if len(rows) > limit else None
+    return [row_to_item(row) for row in rows[:limit]], next_cursor
+
+
+class ItemStore:
+    """SQLite (WAL mode) repository for lost and found reports."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._rankings = OrderedDict()
+        self._rankings_lock = threading.Lock()
+        self._check_integrity()
+        self._migrate()
+
+    @property
+    def conn(self):
+        # Streamlit runs every session on its own thread, so connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.conn
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            metrics.increment("storage_rollbacks_total")
+            raise
+        conn.execute("COMMIT")
+        # Includes waiting for the write lock, which is what a submitting user feels
+        metrics.observe("storage_transaction_seconds", time.perf_counter() - started)
+
+    def _check_integrity(self):
+        # Opening the database replays any committed WAL tail; this verifies the result
+        try:
+            result = self.conn.execute("PRAGMA quick_check").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            result = str(e)
+        if result != "ok":
+            snapshot = latest_snapshot()
+            hint = f" Restore the latest snapshot: {snapshot}" if snapshot else ""
+            raise StorageError(f"Database {self.path} failed its integrity check ({result}).{hint}")
+
+    def _migrate(self):
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+
+    def _allocate_id(self, conn, kind):
+        row = conn.execute("SELECT next_id FROM sequences WHERE kind = ?", (kind,)).fetchone()
+        item_id = row["next_id"] if row else 1
+        conn.execute(
+            "INSERT INTO sequences (kind, next_id) VALUES (?, ?) "
+            "ON CONFLICT (kind) DO UPDATE SET next_id = excluded.next_id",
+            (kind, item_id + 1),
+        )
+        return item_id
+
+    def _insert(self, conn, kind, item):
+        item["place"] = campus.place_key(item["location"])
+        conn.execute(
+            "INSERT INTO items (kind, id, name, contact, category, description, location, timestamp, place, claim_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind,) + tuple(item[field] for field in ITEM_FIELDS) + (item["place"], item.get("claim_hash")),
+        )
+
+    def add_item(self, kind, name, contact, category, description, location, timestamp=None, job=None, claim_hash=None):
+        return self.add_items(kind, [{
+            "name": name,
+            "contact": contact,
+            "category": category,
+            "description": description,
+            "location": location,
+            "timestamp": timestamp,
+            "claim_hash": claim_hash,
+        }], job)[0]
+
+    @metrics.timed("storage_seconds", op="add_items")
+    def add_items(self, kind, records, job=None):
+        """Insert reports in one transaction (one fsync for the whole group); returns the items.
+
+        If `job` names a job type, one job for the new reports is queued in the same transaction.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown report kind: {kind!r}")
+        items = []
+        with self.transaction() as conn:
+            for record in records:
+                item = {field: record[field] for field in ITEM_FIELDS if field not in ("id", "timestamp")}
+                item["timestamp"] = record.get("timestamp") or now_timestamp()
+                item["id"] = self._allocate_id(conn, kind)
+                item["claim_hash"] = record.get("claim_hash")
+                self._insert(conn, kind, item)
+                del item["claim_hash"]
+                item["kind"] = kind
+                item["status"] = "open"
+                items.append(item)
+            metrics.increment("storage_rows_written_total", len(items), kind=kind)
+            if job and items:
+                self._enqueue(conn, job, {"kind": kind, "ids": [item["id"] for item in items]})
+        return items
+
+    def get_item(self, kind, item_id):
+        row = self.conn.execute(
+            "SELECT * FROM items WHERE kind = ? AND id = ?", (kind, item_id)
+        ).fetchone()
+        return row_to_item(row) if row else None
+
+    @metrics.timed("storage_seconds", op="get_items")
+    def get_items(self, kind, item_ids):
+        if not item_ids:
+            return []
+        placeholders = ", ".join("?" * len(item_ids))
+        rows = self.conn.execute(
+            f"SELECT * FROM items WHERE kind = ? AND id IN ({placeholders}) ORDER BY id",
+            (kind, *item_ids),
+        )
+        return [row_to_item(row) for row in rows]
+
+    def item_ids(self, kind):
+        return [row[0] for row in self.conn.execute("SELECT id FROM items WHERE kind = ? ORDER BY id", (kind,))]
+
+    def count(self, kind):
+        return self.conn.execute("SELECT COUNT(*) FROM items WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def list_items(self, kind, limit=-1, offset=0):
+        rows = self.conn.execute(
+            "SELECT * FROM items WHERE kind = ? ORDER BY id LIMIT ? OFFSET ?",
+            (kind, limit, offset),
+        )
+        return [row_to_item(row) for row in rows]
+
+    def search(self, kind, match, limit=-1):
+        """Ranked full-text search; `match` is an FTS5 query (see search.build_match_query)."""
+        rows = self.conn.execute(
+            "SELECT items.* FROM items_fts JOIN items ON items.pk = items_fts.rowid "
+            "WHERE items_fts MATCH ? AND items.kind = ? "
+            "ORDER BY bm25(items_fts, ?, ?, ?), items.pk LIMIT ?",
+            (match, kind) + FTS_WEIGHTS + (limit,),
+        )
+        return [row_to_item(row) for row in rows]
+
+    def iter_items(self, kind, batch_size=1000):
+        """Every report of a kind in id order, read in short keyset batches so writers are never blocked."""
+        after = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT * FROM items WHERE kind = ? AND id > ? ORDER BY id LIMIT ?", (kind, after, batch_size)
+            ).fetchall()
+            for row in rows:
+                yield row_to_item(row)
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]["id"]
+
+    @metrics.timed("storage_seconds", op="get_items_by_pk")
+    def get_items_by_pk(self, pks):
+        """Reports by primary key, in the order given."""
+        if not pks:
+            return []
+        placeholders = ", ".join("?" * len(pks))
+        rows = {row["pk"]: row for row in self.conn.execute(f"SELECT * FROM items WHERE pk IN ({placeholders})", pks)}
+        return [row_to_item(rows[pk]) for pk in pks if pk in rows]
+
+    @metrics.timed("storage_seconds", op="match_pks")
+    def match_pks(self, match):
+        """Primary keys of every full-text match, unranked."""
+        return [row[0] for row in self.conn.execute("SELECT rowid FROM items_fts WHERE items_fts MATCH ?", (match,))]
+
+    def column_rows(self, after_pk=0):
+        """Cursor over (pk, kind, category, location, place, epoch seconds) for reports after `after_pk`.
+
+        Locations are keyed like stats_counters; the timestamp's local time is read as UTC.
+        """
+        expressions = dict(STATS_DIMENSIONS)
+        return self.conn.execute(
+            f"SELECT pk, kind, {expressions['category'].format(row='items')}, "
+            f"{expressions['location'].format(row='items')}, place, CAST(strftime('%s', timestamp) AS INTEGER) "
+            "FROM items WHERE pk > ? ORDER BY pk",
+            (after_pk,),
+        )
+
+    def text_rows(self, after_pk=0):
+        """(pk, category, description, location) for reports after `after_pk`."""
+        return self.conn.execute(
+            "SELECT pk, category, description, location FROM items WHERE pk > ? ORDER BY pk", (after_pk,)
+        ).fetchall()
+
+    def item_count(self):
+        return sum(self.counters("total").get("", {}).values())
+
+    @metrics.timed("storage_seconds", op="list_page")
+    def list_page(self, kind, cursor=None, limit=10):
+        """Newest-first page of reports, keyed on id."""
+        before = decode_cursor(cursor, int)[0] if cursor else 2 ** 62
+        rows = self.conn.execute(
+            "SELECT * FROM items WHERE kind = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (kind, before, limit + 1),
+        )
+        return page_rows(rows, limit, lambda row: (row["id"],))
+
+    @metrics.timed("storage_seconds", op="search_page")
+    def search_page(self, kind, match, cursor=None, limit=10, filters=None):
+        """BM25-ranked page of full-text matches, optionally narrowed by facet filters.
+
+        BM25 scores shift with every insert, so a score cursor would skip or repeat reports.
+        Instead the first page ranks every match once and the cursor is (data version, offset)
+        into that ranking. Rankings are kept per process for the RANKING_CACHE_SIZE most recent
+        searches; a cursor whose ranking was evicted (or made by another process) is re-ranked.
+        """
+        version, offset = decode_cursor(cursor, int, int) if cursor else (self.version(), 0)
+        pks = self._ranking(kind, match, filters or {}, version)
+        next_cursor = encode_cursor(version, offset + limit) if len(pks) > offset + limit else None
+        return self.get_items_by_pk(pks[offset:offset + limit].tolist()), next_cursor
+
+    def _ranking(self, kind, match, filters, version):
+        key = (kind, match, tuple(sorted((facet, tuple(values)) for facet, values in filters.items() if values)), version)
+        with self._rankings_lock:
+            pks = self._rankings.get(key)
+            if pks is not None:
+                self._rankings.move_to_end(key)
+                return pks
+        clause, params = filter_clause(filters)
+        pks = array("q", (row[0] for row in self.conn.execute(
+            "SELECT items.pk FROM items_fts JOIN items ON items.pk = items_fts.rowid "
+            f"WHERE items_fts MATCH ? AND items.kind = ?{clause} "
+            "ORDER BY bm25(items_fts, ?, ?, ?), items.pk",
+            (match, kind) + params + FTS_WEIGHTS,
+        )))
+        with self._rankings_lock:
+            self._rankings[key] = pks
+            while len(self._rankings) > RANKING_CACHE_SIZE:
+                self._rankings.popitem(last=False)
+        return pks
+
+    @metrics.timed("storage_seconds", op="recent_page")
+    def recent_page(self, cursor=None, limit=10):
+        """Newest-first page across both kinds, keyed on (timestamp, pk)."""
+        timestamp, pk = decode_cursor(cursor, str, int) if cursor else ("~", 0)
+        rows = self.conn.execute(
+            "SELECT * FROM items WHERE timestamp < ? OR (timestamp = ? AND pk < ?) "
+            "ORDER BY timestamp DESC, pk DESC LIMIT ?",
+            (timestamp, timestamp, pk, limit + 1),
+        )
+        return page_rows(rows, limit, lambda row: (row["timestamp"], row["pk"]))
+
+    @metrics.timed("storage_seconds", op="block_candidates")
+    def block_candidates(self, kind, start, end, category=None, location_match=None, limit=200, places=None):
+        """Open items of `kind` reported between `start` and `end` sharing the category, location words or a nearby place.
+
+        Claimed and resolved reports are left out, so nobody is pointed at an item already returned.
+        """
+        rows = []
+        if places:
+            rows += self.conn.execute(
+                f"SELECT * FROM items WHERE kind = ? AND place IN ({', '.join('?' * len(places))}) "
+                "AND status = 'open' AND timestamp BETWEEN ? AND ? ORDER BY timestamp DESC LIMIT ?",
+                (kind, *places, start, end, limit),
+            ).fetchall()
+        if category:
+            rows += self.conn.execute(
+                "SELECT * FROM items WHERE kind = ? AND category = ? AND status = 'open' AND timestamp BETWEEN ? AND ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (kind, category, start, end, limit),
+            ).fetchall()
+        if location_match:
+            rows += self.conn.execute(
+                "SELECT items.* FROM items_fts JOIN items ON items.pk = items_fts.rowid "
+                "WHERE items_fts MATCH ? AND items.kind = ? AND items.status = 'open' AND items.timestamp BETWEEN ? AND ? "
+                "ORDER BY items.timestamp DESC LIMIT ?",
+                (f"location : ({location_match})", kind, start, end, limit),
+            ).fetchall()
+        unique = {row["pk"]: row for row in rows}
+        return [row_to_item(row) for row in unique.values()]
+
+    def attach_image(self, kind, item_id, sha256, phash, width, height):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO images (sha256, phash, width, height, created) VALUES (?, ?, ?, ?, ?)",
+                (sha256, phash, width, height, now_timestamp()),
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO item_images (kind, item_id, sha256) VALUES (?, ?, ?)",
+                (kind, item_id, sha256),
+            )
+
+    def item_images(self, kind, item_id):
+        """(sha256, phash) of the photos attached to one report, oldest first."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT images.sha256, images.phash FROM item_images JOIN images USING (sha256) "
+            "WHERE item_images.kind = ? AND item_images.item_id = ? ORDER BY item_images.seq",
+            (kind, item_id),
+        )]
+
+    def first_images(self, kind, item_ids):
+        """{item_id: sha256} of the first photo of each report that has one."""
+        if not item_ids:
+            return {}
+        placeholders = ", ".join("?" * len(item_ids))
+        rows = self.conn.execute(
+            f"SELECT item_id, sha256 FROM item_images WHERE kind = ? AND item_id IN ({placeholders}) "
+            f"ORDER BY seq DESC",
+            (kind, *item_ids),
+        )
+        return {row["item_id"]: row["sha256"] for row in rows}
+
+    def images_since(self, seq):
+        """Attachments newer than `seq` as (seq, kind, item_id, phash), for incremental indexing."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT item_images.seq, item_images.kind, item_images.item_id, images.phash "
+            "FROM item_images JOIN images USING (sha256) WHERE item_images.seq > ? ORDER BY item_images.seq",
+            (seq,),
+        )]
+
+    def claim_hash(self, kind, item_id):
+        row = self.conn.execute("SELECT claim_hash FROM items WHERE kind = ? AND id = ?", (kind, item_id)).fetchone()
+        return row[0] if row else None
+
+    def set_status(self, kind, item_id, status):
+        """Move a report to another lifecycle status; returns whether the report exists."""
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status!r}")
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE items SET status = ?, status_changed = ? WHERE kind = ? AND id = ?",
+                (status, now_timestamp(), kind, item_id),
+            )
+        return cursor.rowcount > 0
+
+    def archive_candidates(self, resolved_before, stale_before, limit):
+        """Reports resolved before `resolved_before`, or still unresolved since before `stale_before`.
+
+        Each carries "photos", the SHA-256s of its attached images (the files stay under images/).
+        """
+        photos = (
+            "(SELECT group_concat(sha256) FROM item_images "
+            "WHERE item_images.kind = items.kind AND item_images.item_id = items.id) AS photos"
+        )
+        rows = self.conn.execute(
+            f"SELECT *, {photos} FROM items WHERE status = 'resolved' AND status_changed < ? "
+            f"UNION SELECT *, {photos} FROM items WHERE timestamp < ? AND status != 'resolved' "
+            "LIMIT ?",
+            (resolved_before, stale_before, limit),
+        )
+        return [
+            dict(row_to_item(row), status_changed=row["status_changed"], photos=row["photos"].split(",") if row["photos"] else [])
+            for row in rows
+        ]
+
+    def delete_items(self, keys):
+        """Remove (kind, id) reports with their matches, notifications and photo links; triggers update FTS and counters.
+
+        IDs are never reused: the sequences table keeps counting past deleted reports.
+        """
+        with self.transaction() as conn:
+            for kind, item_id in keys:
+                own = "lost_id" if kind == "lost" else "found_id"
+                conn.execute(f"DELETE FROM matches WHERE {own} = ?", (item_id,))
+                conn.execute("DELETE FROM notifications WHERE kind = ? AND item_id = ?", (kind, item_id))
+                conn.execute("DELETE FROM item_images WHERE kind = ? AND item_id = ?", (kind, item_id))
+                conn.execute("DELETE FROM items WHERE kind = ? AND id = ?", (kind, item_id))
+            # In-memory indexes only ever append; a changed count tells them to rebuild
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('deletions', 1) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+            )
+
+    def claim_run(self, key, interval):
+        """Compare-and-set a "last run" meta timestamp; True for the one caller that should run now."""
+        if time.time() - float(self.get_meta(key, 0)) < interval:
+            return False
+        with self.transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            if time.time() - float(row[0] if row else 0) < interval:
+                return False
+            self.set_meta(key, str(time.time()))
+        return True
+
+    def _enqueue(self, conn, job_type, payload, delay=0):
+        conn.execute(
+            "INSERT INTO jobs (type, payload, run_after, created) VALUES (?, ?, ?, ?)",
+            (job_type, json.dumps(payload), time.time() + delay, now_timestamp()),
+        )
+
+    def enqueue(self, job_type, payload, delay=0):
+        with self.transaction() as conn:
+            self._enqueue(conn, job_type, payload, delay)
+
+    def claim_job(self, worker, lease):
+        """Take the oldest ready job, or one whose worker's lease ran out; returns it or None."""
+        now = time.time()
+        with self.transaction() as conn:
+            # A running job's run_after is its lease expiry
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') AND run_after <= ? ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, claimed_by = ?, run_after = ? "
+                "WHERE id = ?",
+                (worker, now + lease, row["id"]),
+            )
+        return {"id": row["id"], "type": row["type"], "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"] + 1}
+
+    def finish_job(self, job_id):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def fail_job(self, job_id, error, retry_in=None):
+        """Requeue a failed job after `retry_in` seconds, or park it as failed when None."""
+        with self.transaction() as conn:
+            if retry_in is None:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ? WHERE id = ?", (error, job_id))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ? WHERE id = ?",
+                    (error, time.time() + retry_in, job_id),
+                )
+
+    def job_counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def add_notifications(self, notifications):
+        """Insert (kind, item_id, match_id, score, message) rows, ignoring ones already sent."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO notifications (kind, item_id, match_id, score, message, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [notification + (now_timestamp(),) for notification in notifications],
+            )
+
+    def notifications_for(self, kind, item_ids, after=0):
+        """Notifications for the given reports newer than notification id `after`, newest first."""
+        if not item_ids:
+            return []
+        placeholders = ", ".join("?" * len(item_ids))
+        return [dict(row) for row in self.conn.execute(
+            f"SELECT * FROM notifications WHERE kind = ? AND item_id IN ({placeholders}) AND id > ? "
+            f"ORDER BY id DESC",
+            (kind, *item_ids, after),
+        )]
+
+    def save_matches(self, pairs):
+        """Upsert (lost_id, found_id, score) tuples."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO matches (lost_id, found_id, score, created) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (lost_id, found_id) DO UPDATE SET score = excluded.score",
+                [(lost_id, found_id, score, now_timestamp()) for lost_id, found_id, score in pairs],
+            )
+
+    def top_matches(self, kind, item_id, k=3):
+        """Best (item, score) matches of the opposite kind for one report."""
+        own, other = ("lost_id", "found_id") if kind == "lost" else ("found_id", "lost_id")
+        other_kind = "found" if kind == "lost" else "lost"
+        rows = self.conn.execute(
+            f"SELECT items.*, matches.score FROM matches "
+            f"JOIN items ON items.kind = ? AND items.id = matches.{other} "
+            f"WHERE matches.{own} = ? ORDER BY matches.score DESC LIMIT ?",
+            (other_kind, item_id, k),
+        )
+        return [(row_to_item(row), row["score"]) for row in rows]
+
+    def best_matches(self, k=10):
+        """Highest scoring (lost, found, score) pairs across the whole database."""
+        rows = self.conn.execute(
+            "SELECT lost_id, found_id, score FROM matches ORDER BY score DESC LIMIT ?", (k,)
+        ).fetchall()
+        return [
+            (self.get_item("lost", row["lost_id"]), self.get_item("found", row["found_id"]), row["score"])
+            for row in rows
+        ]
+
+    @metrics.timed("storage_seconds", op="counters")
+    def counters(self, dimension):
+        """{key: {kind: count}} for one stats_counters dimension."""
+        counts = {}
+        for row in self.conn.execute(
+            "SELECT key, kind, n FROM stats_counters WHERE dimension = ? AND n > 0", (dimension,)
+        ):
+            counts.setdefault(row["key"], dict.fromkeys(KINDS, 0))[row["kind"]] = row["n"]
+        return counts
+
+    def backfill_places(self, batch_size=5000):
+        """Resolve every report's campus place again if the gazetteer changed; returns rows updated."""
+        if self.get_meta("gazetteer_version") == campus.GAZETTEER_VERSION:
+            return 0
+        updated = 0
+        after = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT pk, location FROM items WHERE pk > ? ORDER BY pk LIMIT ?", (after, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            with self.transaction() as conn:
+                conn.executemany(
+                    "UPDATE items SET place = ? WHERE pk = ?",
+                    [(campus.place_key(row["location"]), row["pk"]) for row in rows],
+                )
+            updated += len(rows)
+            after = rows[-1]["pk"]
+        self.set_meta("gazetteer_version", campus.GAZETTEER_VERSION)
+        return updated
+
+    def version(self):
+        return int(self.get_meta("data_version", 0))
+
+    def deletions(self):
+        """How many times reports have been deleted (archived) from this database."""
+        return int(self.get_meta("deletions", 0))
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def snapshot(self, directory=SNAPSHOT_DIR, keep=SNAPSHOT_KEEP):
+        """Checkpoint the WAL into the main file and write a consistent copy; returns its path."""
+        os.makedirs(directory, exist_ok=True)
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        path = os.path.join(directory, f"lost_found-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db")
+        partial = f"{path}.partial"
+        target = sqlite3.connect(partial)
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+        os.replace(partial, path)
+        for old in sorted(glob.glob(os.path.join(directory, "lost_found-*.db")))[:-keep]:
+            os.remove(old)
+        self.set_meta("snapshot_version", str(self.version()))
+        return path
+
+    def maybe_snapshot(self, every=SNAPSHOT_EVERY_WRITES):
+        """Snapshot once `every` writes have accumulated since the last one.
+
+        The snapshot is claimed inside a write transaction, so when several server
+        processes cross the threshold together only one of them takes it.
+        """
+        if self.version() - int(self.get_meta("snapshot_version", 0)) < every:
+            return None
+        with self.transaction() as conn:
+            version = int(conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0])
+            row = conn.execute("SELECT value FROM meta WHERE key = 'snapshot_version'").fetchone()
+            if version - int(row[0] if row else 0) < every:
+                return None
+            self.set_meta("snapshot_version", str(version))
+        return self.snapshot()
+
+    def migrate_json(self, path=LEGACY_JSON_PATH):
+        """One-shot import of the legacy lost_found_data.json file. Returns rows imported."""
+        if self.get_meta("json_migrated") or not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        imported = 0
+        with self.transaction() as conn:
+            if conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone():
+                return 0
+            for kind in KINDS:
+                records = data.get(kind, [])
+                # The old store derived IDs from len(list) + 1, so concurrent submits could
+                # produce duplicates; keep the first holder and renumber the rest after the max.
+                seen = {row["id"] for row in conn.execute("SELECT id FROM items WHERE kind = ?", (kind,))}
+                ids = [r["id"] for r in records if isinstance(r.get("id"), int)]
+                next_id = max(ids + list(seen), default=0) + 1
+                for record in records:
+                    item = {field: record.get(field) or "" for field in ITEM_FIELDS}
+                    item["timestamp"] = item["timestamp"] or now_timestamp()
+                    if not isinstance(record.get("id"), int) or record["id"] in seen:
+                        item["id"] = next_id
+                        next_id += 1
+                    else:
+                        item["id"] = record["id"]
+                    seen.add(item["id"])
+                    self._insert(conn, kind, item)
+                    imported += 1
+                conn.execute(
+                    "INSERT INTO sequences (kind, next_id) VALUES (?, ?) "
+                    "ON CONFLICT (kind) DO UPDATE SET next_id = max(next_id, excluded.next_id)",
+                    (kind, next_id),
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (now_timestamp(),)
+            )
+        return imported
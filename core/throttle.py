@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+
+# Throttle Configuration
+# Per process; Groq's free tier allows 30 requests and 6000 tokens a minute for this model
+REQUESTS_PER_MINUTE = int(os.environ.get("LOST_FOUND_CHAT_RPM", "30"))
+TOKENS_PER_MINUTE = int(os.environ.get("LOST_FOUND_CHAT_TPM", "6000"))
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("LOST_FOUND_CHAT_CONCURRENCY", "4"))
+QUEUE_TIMEOUT = 5.0
+RATE_LIMIT_COOLDOWN = 30.0
+
+
+class TokenBucket:
+    """Holds up to `capacity` tokens, refilled continuously at `rate` per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount=1, timeout=0.0):
+        """Take `amount` tokens, waiting up to `timeout` seconds; False (and nothing taken) if they won't come in time."""
+        amount = min(amount, self.capacity)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = max(self.paused_until - now, (amount - self.tokens) / self.rate)
+                if now + wait > deadline:
+                    return False
+                self._cond.wait(wait)
+
+    def give_back(self, amount):
+        with self._cond:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hand out nothing for `seconds`, e.g. after the provider says the quota is used up."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class Flight:
+    """A reply being produced by one caller, which identical callers can follow as it streams in."""
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._cond = threading.Condition()
+
+    def publish(self, text):
+        with self._cond:
+            self.text += text
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self.done = True
+            self._cond.notify_all()
+
+    def follow(self, idle_timeout):
+        """Yield the text from the start as it arrives; TimeoutError if nothing comes for `idle_timeout`."""
+        seen = 0
+        while True:
+            with self._cond:
+                if len(self.text) == seen and not self.done and not self._cond.wait(idle_timeout):
+                    raise TimeoutError(f"No text from the shared request in {idle_timeout}s")
+                text, done = self.text[seen:], self.done
+            seen += len(text)
+            if text:
+                yield text
+            if done:
+                return
+
+
+class Coalescer:
+    """Single flight: concurrent callers with the same key share the first caller's Flight."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def join(self, key):
+        """(flight, leader); the leader publishes to the flight and must call finish(key)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def finish(self, key):
+        with self._lock:
+            flight = self._flights.pop(key)
+        flight.finish()
+
+
+class ChatLimiter:
+    """Client-side request and token quotas plus a bounded pool of concurrent provider calls."""
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 concurrency=MAX_CONCURRENT_REQUESTS):
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.flights = Coalescer()
+
+    def acquire(self, tokens, timeout=QUEUE_TIMEOUT):
+        """Reserve one request, `tokens` tokens and a slot; returns None, or why the call should not be made."""
+        deadline = time.monotonic() + timeout
+        if not self.requests.take(1, timeout):
+            return "rate_limited"
+        if not self.tokens.take(tokens, max(0.0, deadline - time.monotonic())):
+            self.requests.give_back(1)
+            return "rate_limited"
+        if not self.slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self.requests.give_back(1)
+            self.tokens.give_back(tokens)
+            return "busy"
+        return None
+
+    def release(self, reserved, used):
+        """Free the slot and return the tokens reserved but not used."""
+        self.slots.release()
+        if used < reserved:
+            self.tokens.give_back(reserved - used)
+
+    def pause(self, seconds=RATE_LIMIT_COOLDOWN):
+        self.requests.pause(seconds)
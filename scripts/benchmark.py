@@ -0,0 +1,151 @@
+"""Benchmark the lost & found core operations on synthetic datasets, headless (no Streamlit).
+
+    python scripts/benchmark.py --sizes 1000,10000,100000
+    python scripts/benchmark.py --sizes 1000000 --skip-semantic
+    python scripts/benchmark.py --compare benchmarks/<earlier run>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import matching, search, stats
+from core.storage import ItemStore
+from synthetic_data import populate, sample_queries
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+REGRESSION_THRESHOLD = 1.2
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(operation, arguments):
+    """Time `operation` over each argument, then replay one call under tracemalloc for peak memory."""
+    latencies = []
+    for argument in arguments:
+        started = time.perf_counter()
+        operation(argument)
+        latencies.append(time.perf_counter() - started)
+    tracemalloc.start()
+    operation(arguments[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) / total, 1) if total else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(size, calls, skip_semantic, workdir):
+    rng = random.Random(size)
+    db_path = os.path.join(workdir, f"bench-{size}.db")
+    started = time.perf_counter()
+    store = ItemStore(db_path)
+    populate(store, size, seed=size)
+    results = {"load_s": round(time.perf_counter() - started, 2)}
+
+    queries = sample_queries(rng, calls)
+    new_reports = [
+        ("lost" if n % 2 else "found", "Bench", "0300-0000000", "Wallet", f"brown leather wallet {n}", "Main Library")
+        for n in range(calls)
+    ]
+    results["operations"] = {
+        "report_submit": measure(lambda args: store.add_item(*args), new_reports),
+        "report_submit_with_matching": measure(
+            lambda args: matching.update_matches(store, store.add_item(*args)), new_reports
+        ),
+        "search_keyword_page": measure(lambda q: search.search_page(store, q, "found"), queries),
+        "search_empty_page": measure(lambda _: search.search_page(store, "", "found"), queries),
+        "recent_activity_page": measure(lambda _: store.recent_page(None, stats.RECENT_ACTIVITY_SIZE), queries),
+        "statistics_snapshot": measure(lambda _: stats.snapshot(store), queries),
+    }
+
+    if not skip_semantic:
+        from core import embeddings
+
+        started = time.perf_counter()
+        index = embeddings.VectorIndex(store, directory=os.path.join(workdir, f"embeddings-{size}"))
+        results["embedding_backfill_s"] = round(time.perf_counter() - started, 2)
+        results["operations"]["search_semantic_page"] = measure(
+            lambda q: embeddings.semantic_page(index, q, "found"), queries
+        )
+
+    results["db_bytes"] = os.path.getsize(db_path)
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for size, result in current["sizes"].items():
+        for name, op in result["operations"].items():
+            before = baseline["sizes"].get(size, {}).get("operations", {}).get(name)
+            if not before:
+                continue
+            ratio = op["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+            flag = "  REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+            print(f"  {size:>8} {name:<30} p50 {before['p50_ms']:>10.3f} -> {op['p50_ms']:>10.3f} ms ({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((size, name))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated dataset sizes")
+    parser.add_argument("--calls", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--skip-semantic", action="store_true", help="skip the embedding index (needs numpy)")
+    parser.add_argument("--output", help="results file (default: benchmarks/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare p50 latencies against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lost_found_bench_")
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+    try:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            print(f"Benchmarking {size} reports...")
+            result = report["sizes"][str(size)] = run_size(size, args.calls, args.skip_semantic, workdir)
+            for name, op in result["operations"].items():
+                print(f"  {name:<30} {op['throughput_per_s']:>10} ops/s  p50 {op['p50_ms']:>9.3f} ms  "
+                      f"p99 {op['p99_ms']:>9.3f} ms  peak {op['peak_kb']:>9.1f} KiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        print(f"Compared with {args.compare}:")
+        if compare(report, args.compare):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare the memory and facet-filter speed of report representations at scale, headless.
+
+    python scripts/benchmark_memory.py --rows 1000000
+    python scripts/benchmark_memory.py --rows 1000000 --location-variants 0
+
+Measured with tracemalloc, for the same synthetic reports:
+  dicts    - one dict of strings per report, as the JSON-backed app kept them
+  bitsets  - int bitsets per kind and facet value (the facet index before core.columns)
+  columns  - core.columns.ItemTable, as used by the facet index now
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import campus
+from core.facets import FACETS, FacetIndex
+from synthetic_data import generate_reports
+
+EPOCH = datetime(1970, 1, 1)
+SELECT_CALLS = 20
+
+popcount = int.bit_count if hasattr(int, "bit_count") else (lambda bits: bin(bits).count("1"))
+
+
+def free_text(rng, location, variants):
+    # Students rarely type a place the same way twice; variants stand in for that long tail
+    return f"{location} room {rng.randint(1, variants)}" if variants and rng.random() < 0.5 else location
+
+
+def reports(rows, variants, seed=0):
+    rng = random.Random(seed)
+    for pk, (kind, record) in enumerate(generate_reports(rows, seed), start=1):
+        record["location"] = free_text(rng, record["location"], variants)
+        yield pk, kind, record
+
+
+def traced(build):
+    """(result, bytes still allocated by build(), seconds)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def column_row(pk, kind, record):
+    moment = datetime.fromisoformat(record["timestamp"])
+    location = record["location"].strip(" ").lower()
+    return pk, kind, record["category"], location, campus.place_key(record["location"]), int((moment - EPOCH).total_seconds())
+
+
+def build_dicts(lines):
+    # Parsed from JSON so every dict owns its strings, as when loaded from lost_found_data.json
+    return [json.loads(line) for line in lines]
+
+
+def build_bitsets(rows):
+    positions = {}
+    for pk, kind, category, location, place, timestamp in rows:
+        day = datetime.utcfromtimestamp(timestamp).date().isoformat()
+        for facet, value in (("kind", kind), ("category", category), ("location", location), ("day", day), ("place", place)):
+            if value is not None:
+                positions.setdefault((facet, value), []).append(pk)
+    postings = {}
+    for (facet, value), pks in positions.items():
+        buffer = bytearray(max(pks) // 8 + 1)
+        for pk in pks:
+            buffer[pk >> 3] |= 1 << (pk & 7)
+        postings.setdefault(facet, {})[value] = int.from_bytes(buffer, "little")
+    return postings
+
+
+def build_columns(rows, batch=50000):
+    index = FacetIndex()
+    for start in range(0, len(rows), batch):
+        index.table.append(rows[start:start + batch])
+    return index
+
+
+def bitset_select(postings, kind, filters):
+    base = postings["kind"][kind]
+    selected = {}
+    for facet, values in filters.items():
+        selected[facet] = 0
+        for value in values:
+            selected[facet] |= postings[facet].get(value, 0)
+    counts = {}
+    for facet in FACETS:
+        others = base
+        for other, bits in selected.items():
+            if other != facet:
+                others &= bits
+        counts[facet] = {value: popcount(others & bits) for value, bits in postings[facet].items() if others & bits}
+    return counts
+
+
+def timed_calls(operation):
+    latencies = []
+    for _ in range(SELECT_CALLS):
+        started = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies)[len(latencies) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="synthetic reports to load")
+    parser.add_argument("--location-variants", type=int, default=200,
+                        help="free-text spellings per campus location (0 for the 20 plain names)")
+    parser.add_argument("--skip-bitsets", action="store_true", help="skip the slow bitset representation")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} reports...")
+    data = list(reports(args.rows, args.location_variants))
+    raw = sum(len(value.encode("utf-8")) for _, _, record in data for value in record.values())
+    rows = [column_row(pk, kind, record) for pk, kind, record in data]
+    print(f"  raw field bytes: {raw / 2 ** 20:8.1f} MiB, {len({row[3] for row in rows})} distinct locations")
+
+    filters = {"category": ["Wallet"], "place": list(campus.nearby_keys("main_library"))}
+    results = {}
+    lines = [json.dumps(dict(record, id=pk, kind=kind)) for pk, kind, record in data]
+    dicts, size, elapsed = traced(lambda: build_dicts(lines))
+    results["dicts"] = (size, elapsed, None)
+    del dicts, lines
+    if not args.skip_bitsets:
+        postings, size, elapsed = traced(lambda: build_bitsets(rows))
+        results["bitsets"] = (size, elapsed, timed_calls(lambda: bitset_select(postings, "lost", filters)))
+        del postings
+    index, size, elapsed = traced(lambda: build_columns(rows))
+    results["columns"] = (size, elapsed, timed_calls(lambda: index.select("lost", filters)))
+
+    print(f"{'':<10}{'memory MiB':>12}{'bytes/row':>12}{'build s':>10}{'select p50 ms':>16}")
+    for name, (size, elapsed, select) in results.items():
+        select = f"{select * 1000:16.2f}" if select is not None else f"{'-':>16}"
+        print(f"{name:<10}{size / 2 ** 20:12.1f}{size / args.rows:12.1f}{elapsed:10.2f}{select}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Local stand-in for the Groq chat completions API, for exercising the AI Chat page offline.
+
+    python scripts/fake_groq_server.py --port 8787 --fail-first 2 --token-delay 0.05
+    python scripts/fake_groq_server.py --port 8787 --rate-limit 3 --rate-window 20
+    GROQ_API_KEY=test GROQ_BASE_URL=http://127.0.0.1:8787 streamlit run app.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+def make_reply(messages):
+    question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    return f"This is the local test assistant. You asked: {question}"
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    server_version = "FakeGroq/1.0"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _over_quota(self):
+        """Seconds until the quota frees up if this request is over it, else None; call under the lock."""
+        if not self.server.rate_limit:
+            return None
+        now = time.monotonic()
+        accepted = self.server.accepted
+        while accepted and accepted[0] <= now - self.server.rate_window:
+            accepted.popleft()
+        if len(accepted) >= self.server.rate_limit:
+            return max(1, int(accepted[0] + self.server.rate_window - now + 0.999))
+        accepted.append(now)
+        return None
+
+    def do_POST(self):
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.requests <= self.server.fail_first
+            retry_after = self._over_quota()
+        if failing:
+            self._send_json(503, {"error": {"message": "Service unavailable", "type": "server_error"}})
+            return
+        if retry_after is not None:
+            self._send_json(429, {"error": {
+                "message": f"Rate limit reached: limit {self.server.rate_limit} requests per {self.server.rate_window:g}s",
+                "type": "requests",
+                "code": "rate_limit_exceeded",
+            }}, {"Retry-After": str(retry_after)})
+            return
+
+        time.sleep(self.server.first_token_delay)
+        reply = make_reply(request.get("messages", []))
+        words = reply.split(" ")
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", "fake-model")
+        prompt_tokens = sum(len(m.get("content", "")) // 4 for m in request.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)}
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for index, word in enumerate(words):
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if index == 0 else f" {word}"}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.server.token_delay)
+        final = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": completion_id, "usage": usage},
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def make_server(host="127.0.0.1", port=8787, fail_first=0, first_token_delay=0.0, token_delay=0.0, quiet=False,
+                rate_limit=0, rate_window=60.0):
+    server = ThreadingHTTPServer((host, port), FakeGroqHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.fail_first = fail_first
+    server.first_token_delay = first_token_delay
+    server.token_delay = token_delay
+    server.quiet = quiet
+    server.rate_limit = rate_limit
+    server.rate_window = rate_window
+    server.accepted = deque()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with HTTP 503")
+    parser.add_argument("--first-token-delay", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="seconds between streamed tokens")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="accept N requests per window, then answer HTTP 429 with Retry-After (0 for no limit)")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="seconds in the --rate-limit window")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.fail_first, args.first_token_delay, args.token_delay,
+                         rate_limit=args.rate_limit, rate_window=args.rate_window)
+    print(f"Fake Groq API listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
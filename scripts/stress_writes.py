@@ -0,0 +1,90 @@
+"""Fire thousands of concurrent report submissions from many processes and check none are lost.
+
+    python scripts/stress_writes.py --processes 8 --reports 500
+    python scripts/stress_writes.py --full   # submit through DataLayer, queueing background jobs like the app
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.storage import KINDS, ItemStore
+from synthetic_data import CATEGORIES, LOCATIONS
+
+
+def submit_reports(args):
+    worker, reports, db_path, full = args
+    if full:
+        from core.data_layer import DataLayer
+
+        data = DataLayer(ItemStore(db_path))
+        submit = data.add_report
+    else:
+        store = ItemStore(db_path)
+        submit = store.add_item
+    latencies = []
+    for n in range(reports):
+        kind = KINDS[n % 2]
+        started = time.perf_counter()
+        submit(
+            kind, f"Student {worker}", f"0300-{worker:03d}{n:04d}", CATEGORIES[n % len(CATEGORIES)],
+            f"worker {worker} report {n}", LOCATIONS[n % len(LOCATIONS)],
+        )
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--reports", type=int, default=500, help="reports per process")
+    parser.add_argument("--db", help="database path (default: a fresh temporary file)")
+    parser.add_argument("--full", action="store_true", help="submit through DataLayer, as the app does")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lost_found_stress_")
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, "stress.db")
+    os.chdir(workdir)  # embeddings/ and snapshots/ land next to the temporary database
+    store = ItemStore(db_path)
+    before = {kind: store.count(kind) for kind in KINDS}
+
+    started = time.perf_counter()
+    with Pool(args.processes) as pool:
+        jobs = [(worker, args.reports, db_path, args.full) for worker in range(args.processes)]
+        latencies = [latency for result in pool.map(submit_reports, jobs) for latency in result]
+    elapsed = time.perf_counter() - started
+
+    submitted = args.processes * args.reports
+    print(f"{submitted} reports from {args.processes} processes in {elapsed:.2f}s "
+          f"({submitted / elapsed:.0f}/s), p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+
+    failures = []
+    for kind in KINDS:
+        expected = before[kind] + sum(1 for n in range(args.reports) if KINDS[n % 2] == kind) * args.processes
+        ids = store.item_ids(kind)
+        if len(ids) != expected:
+            failures.append(f"{kind}: expected {expected} rows, found {len(ids)}")
+        if ids != list(range(1, len(ids) + 1)):
+            failures.append(f"{kind}: IDs are not unique and contiguous")
+        counted = store.counters("total").get("", {}).get(kind, 0)
+        if counted != len(ids):
+            failures.append(f"{kind}: stats counter says {counted}, table has {len(ids)}")
+
+    if failures:
+        print("FAILED\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("OK: no reports lost, IDs unique and contiguous, counters consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Realistic synthetic lost & found reports for benchmarks and load tests."""
+import random
+from datetime import datetime, timedelta
+
+from core.storage import CATEGORIES, KINDS, TIMESTAMP_FORMAT
+
+LOCATIONS = [
+    "Main Library", "Library 2nd Floor", "CS Department", "Chemistry Department", "Physics Lab",
+    "Pharmacy Department", "Management Sciences", "Law Department", "Admin Block", "Examination Hall",
+    "Cafeteria", "Boys Hostel", "Girls Hostel", "Mosque", "Sports Ground", "Auditorium",
+    "Bus Stop", "Parking Area", "Main Gate", "Garden Campus",
+]
+COLORS = ["black", "blue", "red", "white", "grey", "brown", "green", "silver", "golden", "pink", "navy blue"]
+ITEMS = {
+    "Mobile": (["Samsung Galaxy A52", "iPhone 13", "Infinix Hot 12", "Oppo A16", "Vivo Y20", "Tecno Spark 8", "Redmi Note 11"],
+               ["cracked screen", "transparent cover", "sticker on the back", "dual SIM", "broken camera glass"]),
+    "Wallet": (["leather wallet", "purse", "card holder", "small clutch"],
+               ["has my CNIC inside", "some cash and ATM card", "zip pocket torn", "initials stitched on it"]),
+    "Keys": (["bunch of keys", "bike key", "car key", "hostel room key"],
+             ["on a red keychain", "three keys on a ring", "with a Honda tag", "with a small torch attached"]),
+    "Laptop": (["Dell Latitude", "HP EliteBook", "Lenovo ThinkPad", "MacBook Air", "Acer Aspire"],
+               ["in a black sleeve", "stickers on the lid", "charger not included", "scratched corner"]),
+    "Bag": (["backpack", "handbag", "laptop bag", "shopping bag", "sports bag"],
+            ["with books inside", "broken zip", "university logo", "water bottle in side pocket"]),
+    "ID Card": (["student card", "CNIC", "library card", "hostel card"],
+                ["name on front", "in a plastic holder", "with blue lanyard", "department BS Computer Science"]),
+    "Books": (["Calculus textbook", "Data Structures book", "English notebook", "register", "Organic Chemistry notes"],
+              ["name written inside", "spiral bound", "covered in brown paper", "highlighted pages"]),
+    "Charger": (["phone charger", "laptop charger", "power bank", "USB-C cable"],
+                ["Samsung fast charger", "long cable", "white adapter", "10000 mAh"]),
+    "Headphones": (["earbuds", "AirPods", "wired earphones", "headphones"],
+                   ["in a white case", "one earbud missing", "JBL brand", "with mic"]),
+    "Other": (["umbrella", "water bottle", "watch", "glasses", "calculator", "jacket"],
+              ["Casio brand", "left on a bench", "metal body", "in a case"]),
+}
+
+
+def describe(rng, category):
+    names, details = ITEMS[category]
+    return f"{rng.choice(COLORS).capitalize()} {rng.choice(names)}, {rng.choice(details)}"
+
+
+def generate_reports(n, seed=0, start=datetime(2026, 2, 1), days=120):
+    """Yield n (kind, record) pairs in timestamp order; lost reports slightly outnumber found ones."""
+    rng = random.Random(seed)
+    step = timedelta(days=days) / max(n, 1)
+    for i in range(n):
+        category = rng.choice(CATEGORIES)
+        yield ("lost" if rng.random() < 0.55 else "found"), {
+            "name": f"Student {rng.randint(1, 20000)}",
+            "contact": f"03{rng.randint(0, 49):02d}-{rng.randint(0, 9999999):07d}",
+            "category": category,
+            "description": describe(rng, category),
+            "location": rng.choice(LOCATIONS),
+            "timestamp": (start + step * i).strftime(TIMESTAMP_FORMAT),
+        }
+
+
+def populate(store, n, seed=0, batch_size=10000):
+    """Bulk-load n synthetic reports using group commits; returns the counts per kind."""
+    counts = dict.fromkeys(KINDS, 0)
+    batches = dict((kind, []) for kind in KINDS)
+    for kind, record in generate_reports(n, seed):
+        batches[kind].append(record)
+        counts[kind] += 1
+        if len(batches[kind]) >= batch_size:
+            store.add_items(kind, batches[kind])
+            batches[kind] = []
+    for kind, records in batches.items():
+        if records:
+            store.add_items(kind, records)
+    return counts
+
+
+def sample_queries(rng, count):
+    """Search queries shaped like what students type: an item, a colour, a place."""
+    queries = []
+    for _ in range(count):
+        category = rng.choice(CATEGORIES)
+        words = [rng.choice(ITEMS[category][0]).split()[-1].lower()]
+        if rng.random() < 0.6:
+            words.insert(0, rng.choice(COLORS).split()[-1])
+        if rng.random() < 0.4:
+            words.append(rng.choice(LOCATIONS).split()[0].lower())
+        queries.append(" ".join(words))
+    return queries
@@ -0,0 +1,144 @@
+"""AI chat retries, rate limiting and coalescing against scripts/fake_groq_server.py, offline."""
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from core.chat import ERROR_REPLY, ChatService, create_client
+from core.chat_context import new_state
+from core.data_layer import DataLayer
+from core.storage import ItemStore
+from core.throttle import ChatLimiter
+from fake_groq_server import make_server
+
+LOCAL_NOTE = "automatic answer from the report database"
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    # Embeddings, images and the legacy JSON import all resolve relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    data = DataLayer(ItemStore(str(tmp_path / "lost_found.db")))
+    data.add_reports("found", [{
+        "name": "Desk", "contact": "0300-0000000", "category": "Wallet",
+        "description": "Brown leather wallet", "location": "Main Library",
+    }])
+    return data
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**options):
+        server = make_server(port=0, quiet=True, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, create_client("test", f"http://127.0.0.1:{server.server_address[1]}")
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def ask(service, message):
+    return service.reply([{"role": "user", "content": message}], new_state())
+
+
+def test_transient_errors_are_retried(data, serve):
+    server, client = serve(fail_first=2)
+    reply, tokens = ask(ChatService(data, client, limiter=ChatLimiter()), "Has anyone found a wallet?")
+
+    assert server.requests == 3
+    assert "You asked: Has anyone found a wallet?" in reply
+    assert tokens["received"] > 0
+
+
+def test_rate_limit_pauses_and_falls_back(data, serve):
+    server, client = serve(rate_limit=1, rate_window=30)
+    limiter = ChatLimiter()
+    service = ChatService(data, client, limiter=limiter)
+
+    reply, _ = ask(service, "Has anyone found a wallet?")
+    assert "You asked" in reply
+
+    reply, tokens = ask(service, "Where can I find my wallet?")
+    assert server.requests == 2
+    assert tokens.get("local")
+    assert LOCAL_NOTE in reply and "Brown leather wallet" in reply
+    assert limiter.requests.paused_until > time.monotonic() + 20
+
+    # While paused, nothing is sent upstream
+    _, tokens = ask(service, "Any news about a wallet?")
+    assert server.requests == 2
+    assert tokens.get("local")
+
+
+def test_identical_prompts_share_one_call(data, serve):
+    server, client = serve(first_token_delay=0.5, token_delay=0.05)
+    service = ChatService(data, client, limiter=ChatLimiter())
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(ask(service, "Has anyone found a wallet?")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.requests == 1
+    assert len({reply for reply, _ in results}) == 1
+    assert sum(1 for _, tokens in results if tokens.get("shared")) == 3
+
+
+def test_unreachable_provider_falls_back(data):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    service = ChatService(data, create_client("test", f"http://127.0.0.1:{port}"), limiter=ChatLimiter())
+    reply, tokens = ask(service, "Has anyone found a wallet?")
+
+    assert tokens.get("local")
+    assert "can't be reached" in reply
+
+
+def test_no_client_answers_locally(data):
+    reply, tokens = ask(ChatService(data), "How do I report a lost card?")
+
+    assert tokens.get("local")
+    assert "Report Lost" in reply
+
+
+def test_claim_help_asks_for_the_claim_code(data):
+    reply, _ = ask(ChatService(data), "How do I mark my report resolved?")
+
+    assert "claim code shown when the report was submitted" in reply
+    assert "Lost &amp; Found desk" in reply
+    assert "contact number" not in reply
+
+
+class LockedCache:
+    def get(self, message, grounding):
+        return None
+
+    def put(self, message, grounding, reply):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_cache_write_failure_keeps_the_reply(data, serve):
+    server, client = serve()
+    reply, tokens = ask(ChatService(data, client, LockedCache(), ChatLimiter()), "Has anyone found a wallet?")
+
+    assert "You asked: Has anyone found a wallet?" in reply
+    assert ERROR_REPLY not in reply
+    assert tokens["received"] > 0
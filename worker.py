@@ -0,0 +1,31 @@
+"""Background worker: matches, embeds and notifies for newly submitted reports.
+
+    LOST_FOUND_WORKER=external streamlit run app.py
+    python worker.py --threads 2      # as many of these as needed, next to the app
+"""
+import argparse
+import signal
+import threading
+
+import core
+from core.jobs import Worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=1, help="worker threads in this process")
+    args = parser.parse_args()
+
+    data = core.get_data_layer()
+    workers = [Worker(data) for _ in range(args.threads)]
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: [worker.stop() for worker in workers])
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()